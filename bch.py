@@ -15,9 +15,15 @@ def nndivide(poly,num): # both args as int
         bits-=1
     return num
 
+def tdivide(poly,num): # table driven nndivide for up to 32 bit numbers
+    if num>>32 or poly not in divtabs:
+        return nndivide(poly,num)
+    t0,t1,t2,t3=divtabs[poly]
+    return t0[num&0xff]^t1[(num>>8)&0xff]^t2[(num>>16)&0xff]^t3[num>>24]
+
 def ndivide(poly,bits):
     num=int(bits,2)
-    return nndivide(poly,num)
+    return tdivide(poly,num)
 
 def divide(a,b): # returns b%a in GF(2) fast/binary version
     return nndivide(int(a,2),int(b,2))
@@ -102,7 +108,9 @@ def repair(a,b): # "repair" two bit errors by brute force.
                 return (2,bnum2str)
     return(-1,b)
 
-def nrepair1(a,b): # "repair" one bit error by brute force.
+def nrepair1(a,b): # "repair" one bit error
+    if a in synlimits and synlimits[a][0]>=len(b):
+        return synrepair(a,b,1)
     r=ndivide(a,b)
     if(r==0):
         return (0,b)
@@ -116,7 +124,9 @@ def nrepair1(a,b): # "repair" one bit error by brute force.
             return (1,bnum1str)
     return(-1,b)
 
-def nrepair2(a,b): # "repair" two bit errors by brute force.
+def nrepair2(a,b): # "repair" two bit errors
+    if a in synlimits and synlimits[a][0]>=len(b) and synlimits[a][1]>=2:
+        return synrepair(a,b,2)
     r=ndivide(a,b)
     if(r==0):
         return (0,b)
@@ -138,8 +148,21 @@ def nrepair2(a,b): # "repair" two bit errors by brute force.
                 return (2,bnum2str)
     return(-1,b)
 
+def synrepair(poly, b, maxerrs): # like nrepair, but fix at most maxerrs bits within len(b)
+    # syndromes are unique (checked by mk_syn), so this finds the same fix as the brute force search
+    bnum=int(b,2)
+    r=tdivide(poly, bnum)
+    if(r==0):
+        return (0,b)
+    syn=syndromes[poly][r]
+    if syn is None or syn[0]>maxerrs or syn[1]>>len(b):
+        return(-1,b)
+
+    fstr="{0:0%db}"%len(b)
+    return (syn[0],fstr.format(syn[1]^bnum))
+
 def nrepair(poly, b): # "repair" any bit errors by syndromes
-    r=nndivide(poly, int(b,2))
+    r=tdivide(poly, int(b,2))
     if(r==0):
         return (0,b)
     if syndromes[poly][r] is None: # uncorrectable
@@ -151,6 +174,16 @@ def nrepair(poly, b): # "repair" any bit errors by syndromes
     fstr="{0:0%db}"%len(b)
     return (ecnt,fstr.format(bnum))
 
+def nnrepair(poly, num): # int version of nrepair
+    r=tdivide(poly, num)
+    if(r==0):
+        return (0,num)
+    if syndromes[poly][r] is None: # uncorrectable
+        return(-1,num)
+
+    ecnt, eloc = syndromes[poly][r]
+    return (ecnt,eloc ^ num)
+
 def bch_repair1(poly,bits):
     (errs,repaired)=nrepair1(poly,bits)
     return (errs,repaired[:-poly.bit_length()+1],repaired[-poly.bit_length()+1:])
@@ -163,9 +196,15 @@ def bch_repair(poly,bits):
     (errs,repaired)=nrepair(poly,bits)
     return (errs,repaired[:-poly.bit_length()+1],repaired[-poly.bit_length()+1:])
 
+def mk_tab(poly):
+    # remainder is linear in GF(2): combine the remainders of each byte
+    divtabs[poly]=[[nndivide(poly, b<<(8*n)) for b in range(256)] for n in range(4)]
+
 def mk_syn(poly, bits, synbits, errors=1, debug=False):
     assert errors in (1,2,3)
     syndromes[poly]=[None]*(2**(synbits))
+    synlimits[poly]=(bits, errors)
+    mk_tab(poly)
 
     if debug:
         print("Creating syndromes for poly=%d with %d bits and max %d bit-errors"%(poly, bits, errors))
@@ -176,7 +215,10 @@ def mk_syn(poly, bits, synbits, errors=1, debug=False):
         r=nndivide(poly,val)
         if debug:
             print(("1 {:0%db} -> {:4d} / {:0%db}"%(bits,synbits)).format(val,r,r))
-        syndromes[poly][r]=(1, val)
+        if syndromes[poly][r] is None:
+            syndromes[poly][r]=(1, val)
+        else:
+            raise AssertionError("Poly(%d) collision on syndrome %d (error locators %s / %s)"%(poly, r, bin(val), bin(syndromes[poly][r][1])))
 
     if errors >= 2:
         for n1 in range(0,bits):
@@ -221,6 +263,8 @@ def print_syn(syndromes, bits=31, synbits=10):
 
 
 syndromes={}
+synlimits={}
+divtabs={}
 
 def init(debug=False):
     mk_syn(poly=29,   bits=7,  synbits=4,            debug=debug)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim: set ts=4 sw=4 tw=0 et pm=:
+
+"""
+Packed binary version of the .bits format
+
+    bitspack.py in.bits[.xz] out.pbits      # convert
+    bitspack.py -d in.pbits[.xz] out.bits   # and back
+
+iridium-parser.py reads .pbits files (optionally .xz/.bz2/.gz/.zst compressed)
+directly, without any regex parsing.
+
+File layout (little endian): the magic, then a sequence of records, each
+starting with a one byte record type:
+
+  F  filename of the following frames: H length, utf-8 name
+  T  verbatim text line (unparseable lines, extra data): I length, utf-8 line
+  R/W/N  RAW/RWA/NC1 frame:
+     B flags (1: N:snr/noise, 2: A:OK), B confidence, B id length,
+     I frequency, H length field, H number of bits,
+     d timestamp, d level, [d snr, d noise], id, bits packed MSB first
+
+Frame records always have an I: id, lines with an L: id are stored as
+text records so they convert back unchanged.
+"""
+
+import sys
+import os
+import struct
+import argparse
+
+from readahead import open_file, compressed
+
+MAGIC=b"IRPBITS\x01"
+
+frame_hdr=struct.Struct("<BBBIHHdd")
+noise_hdr=struct.Struct("<dd")
+name_hdr=struct.Struct("<H")
+text_hdr=struct.Struct("<I")
+
+frame_types={"RAW": b"R", "RWA": b"W", "NC1": b"N"}
+frame_names={ord(v): k for (k, v) in frame_types.items()}
+
+F_NOISE=1
+F_ACCESS_OK=2
+
+def is_packed(filename):
+    base, ext = os.path.splitext(filename)
+    if ext in compressed:
+        ext = os.path.splitext(base)[1]
+    return ext == '.pbits'
+
+def pack(g):
+    """Pack the groups of a parse_raw()d line into a frame record.
+
+    The level is stored after the level==0 fixup of Message().
+    """
+    (rtype, _, timestamp, frequency, snr, noise, access, fid, confidence, level, length, bits, _) = g
+    level=float(level)
+    if level==0:
+        level=float(g[9]+"1")
+    flags=0
+    if snr is not None:
+        flags|=F_NOISE
+    elif access=="OK":
+        flags|=F_ACCESS_OK
+    fid=fid.encode('ascii')
+    nbits=len(bits)
+    rec=frame_types[rtype]+frame_hdr.pack(flags, int(confidence), len(fid), int(frequency), int(length), nbits, float(timestamp), level)
+    if flags & F_NOISE:
+        rec+=noise_hdr.pack(float(snr), float(noise))
+    rec+=fid
+    if nbits:
+        rec+=int(bits, 2).to_bytes((nbits+7)//8, 'big')
+    return rec
+
+def pack_text(line):
+    line=line.encode('utf-8', 'surrogateescape')
+    return b"T"+text_hdr.pack(len(line))+line
+
+def pack_name(filename):
+    filename=filename.encode('utf-8', 'surrogateescape')
+    return b"F"+name_hdr.pack(len(filename))+filename
+
+def convert(infile, outfile):
+    """Convert text lines to a packed file, returns (frames, text lines)"""
+    import bitsparser
+    filename=None
+    frames=0
+    texts=0
+    outfile.write(MAGIC)
+    for line in infile:
+        line=line.rstrip("\n")
+        g=bitsparser.parse_raw(line.strip())
+        rec=None
+        if g is not None and not g[12] and line.split(None, 6)[5].startswith("I:"):
+            try:
+                rec=pack(g)
+            except (struct.error, ValueError, UnicodeError, OverflowError):
+                pass
+        if rec is None:
+            outfile.write(pack_text(line))
+            texts+=1
+            continue
+        if g[1]!=filename:
+            filename=g[1]
+            outfile.write(pack_name(filename))
+        outfile.write(rec)
+        frames+=1
+    return (frames, texts)
+
+class Reader(object):
+    """Iterate over a packed file.
+
+    Frames are returned as tuples like parse_raw() returns them, but with
+    numbers instead of strings. Text records are returned as str.
+    """
+    def __init__(self, filename):
+        if filename == '-':
+            self.file=sys.stdin.buffer
+        else:
+            self.file=open_file(filename, 'rb')
+        if self.file.read(len(MAGIC))!=MAGIC:
+            raise ValueError("%s: not a packed bits file"%filename)
+        self.records=self.read_records()
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self):
+        return self.records
+
+    def read_records(self):
+        read=self.file.read
+        filename=None
+        while True:
+            rtype=read(1)
+            if not rtype:
+                return
+            if rtype==b"F":
+                (size,)=name_hdr.unpack(read(name_hdr.size))
+                filename=read(size).decode('utf-8', 'surrogateescape')
+            elif rtype==b"T":
+                (size,)=text_hdr.unpack(read(text_hdr.size))
+                yield read(size).decode('utf-8', 'surrogateescape')
+            elif rtype[0] in frame_names:
+                (flags, confidence, idlen, frequency, length, nbits, timestamp, level)=frame_hdr.unpack(read(frame_hdr.size))
+                if flags & F_NOISE:
+                    (snr, noise)=noise_hdr.unpack(read(noise_hdr.size))
+                    access=None
+                else:
+                    snr=noise=None
+                    access="OK" if flags & F_ACCESS_OK else "no"
+                fid=read(idlen).decode('ascii')
+                if nbits:
+                    bits=format(int.from_bytes(read((nbits+7)//8), 'big'), '0%db'%nbits)
+                else:
+                    bits=""
+                yield (frame_names[rtype[0]], filename, timestamp, frequency, snr, noise, access, fid, confidence, level, length, bits, "")
+            else:
+                raise ValueError("corrupt packed bits file: record type %r"%rtype)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert .bits files to the packed binary format (and back)")
+    parser.add_argument("-d", "--decode", action="store_true",
+                        help="convert a packed file back to text")
+    parser.add_argument("infile", help="input file ('-' for stdin)")
+    parser.add_argument("outfile", help="output file ('-' for stdout)")
+    args = parser.parse_args()
+
+    if args.decode:
+        import bitsparser
+        if args.outfile == '-':
+            outfile=sys.stdout
+        else:
+            outfile=open_file(args.outfile, 'wt')
+        with Reader(args.infile) as reader:
+            for rec in reader:
+                if isinstance(rec, str):
+                    print(rec, file=outfile)
+                else:
+                    print(bitsparser.format_raw(rec), file=outfile)
+    else:
+        if args.infile == '-':
+            infile=sys.stdin
+        else:
+            infile=open_file(args.infile, 'rt')
+        if args.outfile == '-':
+            outfile=sys.stdout.buffer
+        else:
+            outfile=open_file(args.outfile, 'wb')
+        (frames, texts)=convert(infile, outfile)
+        print("%d frames, %d text lines"%(frames, texts), file=sys.stderr)
+    outfile.close()
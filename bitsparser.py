@@ -4,13 +4,18 @@
 
 import sys
 import re
+import copy
 import struct
+import argparse
+import operator
+import platform
 import fileinput
 import datetime
+import functools
 from math import sqrt,atan2,pi,log
 
 import crcmod
-from bch import ndivide, nrepair, bch_repair, bch_repair1
+from bch import ndivide, nrepair, nnrepair, bch_repair, bch_repair1
 import rs
 import rs6
 
@@ -27,6 +32,8 @@ NXT_UW_DOWNLINK = [2,2,0,2,2,0,2,0,2,0,2,2]
 NXT_UW_UPLINK   = [0,2,0,0,0,0,0,0,2,0,2,0]
 header_messaging="00110011111100110011001111110011" # 0x9669 in BPSK
 header_time_location="11"+"0"*94
+int_header_messaging=int(header_messaging,2)
+int_header_time_location=int(header_time_location,2)
 messaging_bch_poly=1897
 ringalert_bch_poly=1207
 acch_bch_poly=3545 # 1207 also works?
@@ -39,123 +46,232 @@ sdr_ppm=  100e-6 # SDR freq offset
 f_simplex = (1626104e3 - f_doppler - f_jitter ) * (1- sdr_ppm) # lower bound for simplex channel
 f_duplex  = (1625979e3 + f_doppler + f_jitter ) * (1+ sdr_ppm) # upper bound for duplex cannel
 
-# commandline arguments
+# commandline arguments, used by Message() if no Parser is given
 args = None
+default_parser = None
 
 def set_opts(new_args):
-    global args
+    global args, default_parser
     args = new_args
+    default_parser = Parser(args)
 
 class ParserError(Exception):
     def __init__(self, message):
         super().__init__(message)
         self.cls=sys._getframe(1).f_locals['self'].__class__.__name__
 
-tswarning=False
-tsoffset=0
-maxts=0
+# Filename formats containing the recording start time
+fn_t1=      r"i-(\d+)-t1$"
+fn_dated=   r"(\d\d)-(\d\d)-(20\d\d)T(\d\d)-(\d\d)-(\d\d)-[sr]1"
+fn_b26=     r"i-(\d+(?:\.\d+)?)-[vbsrtl]1.([a-z])([a-z])"
+fn_offset=  r"i-(\d+(?:\.\d+)?)-[vbsrtl]1(?:-o[+-]\d+)?$"
+
+@functools.lru_cache(maxsize=256)
+def file_start(filename):
+    """Recording start time encoded in the filename
+
+    Returns (startts, offset in ms to add to the timestamps, fileinfo, b26),
+    startts is None if the filename contains no start time.
+    """
+    # Current format:
+    mm=re.match(fn_t1,filename)
+    if mm:
+        startts=int(mm.group(1))
+        return (startts, 0, "p-%d"%startts, None)
+    # Older file formats:
+    mm=re.match(fn_dated,filename)
+    if mm:
+        month, day, year, hour, minute, second = map(int, mm.groups())
+        ts=datetime.datetime(year,month,day,hour,minute,second)
+        startts=int(ts.timestamp())
+        return (startts, 0, "p-%d"%startts, None)
+    mm=re.match(fn_b26,filename)
+    if mm:
+        b26=(ord(mm.group(2))-ord('a'))*26+ ord(mm.group(3))-ord('a')
+        startts=float(mm.group(1))+b26*600
+        return (int(startts), (startts%1)*(10**3), "p-%d"%startts, b26)
+    mm=re.match(fn_offset,filename)
+    if mm:
+        startts=float(mm.group(1))
+        return (int(startts), (startts%1)*(10**3), "p-%d"%startts, None)
+
+    return (None, 0, "u-"+filename.replace("-","."), None)
+
+def has_starttime(filename):
+    return file_start(filename)[0] is not None
+
+def raw_globalns(line):
+    """globalns of a RAW line as Message() computes it, None if the file
+    has no start time or the line can't be split"""
+    try:
+        if isinstance(line, tuple):
+            (filename, timestamp)=line[1:3]
+        else:
+            _, filename, timestamp, _ = line.split(None, 3)
+        if filename=="/dev/stdin":
+            filename="-"
+        (startts, tsadd, _, _)=file_start(filename)
+        if startts is None:
+            return None
+        return startts*(10**9)+int((float(timestamp)+tsadd)*(10**6))
+    except ValueError:
+        return None
+
+def _isnum(s): # \d+(?:\.\d+)?
+    (a, dot, b)=s.partition(".")
+    return a.isdecimal() and (b.isdecimal() or not dot)
+
+def _isfloat(s): # [\d.]+ that float() accepts
+    return s.replace(".", "", 1).isdecimal()
+
+raw_types=("RAW:", "RWA:", "NC1:")
+
+def split_raw(line):
+    """Split a RAW line into the same groups as Message.p, but with a
+    plain 0/1 bitstream (returns None for unusual lines, use match_raw)"""
+    f=line.split(" ", 6)
+    if len(f)<7 or f[0] not in raw_types:
+        return None
+    (typ, filename, ts, freq, sig, ident, rest)=f
+    (conf, _, rest)=rest.lstrip(" ").partition(" ")
+    (level, _, rest)=rest.partition(" ")
+    (symbols, _, bits)=rest.lstrip(" ").partition(" ")
+    if not (freq.isdecimal() and symbols.isdecimal() and conf[:-1].isdecimal() and conf[-1:]=="%"):
+        return None
+    if not (_isfloat(ts[1:] if ts[:1]=="-" else ts) and (_isfloat(level) or level in ("inf", "nan"))):
+        return None
+    if ident[:2] not in ("I:", "L:") or not ident[2:].isalnum():
+        return None
+    if sig[:2]=="A:":
+        (snr, noise, ok)=(None, None, sig[2:])
+        if not ok.isalnum():
+            return None
+    elif sig[:2]=="N:":
+        i=sig.find("-", 3)
+        if i<0:
+            i=sig.find("+", 3)
+        if i<0:
+            return None
+        (snr, noise, ok)=(sig[2:i], sig[i:], None)
+        if not (_isnum(snr[1:] if snr[0] in "+-" else snr) and _isnum(noise[1:])):
+            return None
+    else:
+        return None
+    if not bits or bits.count("0")+bits.count("1")!=len(bits):
+        return None
+    return (typ[:3], filename, ts, freq, snr, noise, ok, ident[2:], conf[:-1], level, symbols, bits, "")
+
+bitstrip=str.maketrans("", "", "[]<> ")
+
+def match_raw(line):
+    """Regex version of split_raw()"""
+    m=Message.p.match(line)
+    if not m:
+        return None
+    g=m.groups()
+    return g[:11]+(g[11].translate(bitstrip),)+g[12:]
+
+# CPython's regex engine beats the hand-written split on plain lines, on
+# PyPy split_raw() avoids the regex (compare with tests/bench_split_raw.py)
+if platform.python_implementation()=="PyPy":
+    parse_raw=lambda line: split_raw(line) or match_raw(line)
+else:
+    parse_raw=match_raw
+
+def raw_groups(line):
+    """parse_raw() for text lines, records read from packed files are already split"""
+    if isinstance(line, tuple):
+        return line
+    return parse_raw(line)
+
+def format_raw(g):
+    """Text line for already split groups (with numbers instead of strings)"""
+    if g[4] is not None:
+        signal="N:%05.2f%+06.2f"%(g[4],g[5])
+    else:
+        signal="A:%s"%g[6]
+    return "%s: %s %012.4f %d %s I:%s %3d%% %.5f %3d %s%s"%(g[0],g[1],g[2],g[3],signal,g[7],g[8],g[9],g[10],g[11],g[12])
 
 class Message(object):
     p = re.compile(r'(RAW|RWA|NC1): ([^ ]*) (-?[\d.]+) (\d+) (?:N:([+-]?\d+(?:\.\d+)?)([+-]\d+(?:\.\d+)?)|A:(\w+)) [IL]:(\w+) +(\d+)% ([\d.]+|inf|nan) +(\d+) ([\[\]<> 01]+)(.*)')
     parse_error=False
     error=False
-    def __init__(self,line):
+    frametype=None # line type printed by pretty() ("IDA", ...) of upgraded messages
+    def __init__(self,line,lineno=None,parser=None):
+        if parser is None:
+            parser=default_parser
+        self.parser=parser
+        args=parser.args
         self.error_msg=[]
-        self.lineno=fileinput.lineno()
-        m=self.p.match(line)
+        if lineno is None:
+            lineno=fileinput.lineno()
+        self.lineno=lineno
+        g=raw_groups(line)
         if(args.errorfile != None):
-            self.line=line
-        if(not m):
+            self.line=line if isinstance(line, str) else format_raw(g)
+        if(g is None):
             self._new_error("Couldn't parse: "+line)
             self.parse_error=True
             return
-        self.swapped = (m.group(1) != "RWA")
-        self.next = (m.group(1) == "NC1")
-        self.filename=m.group(2)
+        self.swapped = (g[0] != "RWA")
+        self.next = (g[0] == "NC1")
+        self.filename=g[1]
         if self.filename=="/dev/stdin":
             self.filename="-";
-        self.timestamp=float(m.group(3))
+        self.timestamp=float(g[2])
         if self.timestamp<0 or self.timestamp>1000*60*60*24*999: # 999d
             self._new_error("Timestamp out of range")
-        self.frequency=int(m.group(4))
+        self.frequency=int(g[3])
 
-        if args.channelize:
-            self.freq_print=channelize_str(self.frequency)
-        else:
-            self.freq_print="%010d"%(self.frequency)
+        if self.parser.eager_fields:
+            self._fmt_freq()
 
-        if m.group(5) is not None:
-            self.snr=float(m.group(5))
-            self.noise=float(m.group(6))
+        if g[4] is not None:
+            self.snr=float(g[4])
+            self.noise=float(g[5])
         else:
-            self.access_ok=(m.group(7)=="OK")
+            self.access_ok=(g[6]=="OK")
 
-        self.id=m.group(8)
+        self.id=g[7]
 
-        self.confidence=int(m.group(9))
-        self.level=float(m.group(10))
+        self.confidence=int(g[8])
+        self.level=float(g[9])
         if self.level==0:
-            self.level=float(m.group(10)+"1")
+            self.level=float(g[9]+"1")
         self.leveldb=20*log(self.level,10)
-#        self.raw_length=m.group(11)
-        self.bitstream_raw=(re.sub(r"[\[\]<> ]","",m.group(12))) # raw bitstring with correct symbols
+#        self.raw_length=g[10]
+        self.bitstream_raw=g[11] # raw bitstring with correct symbols
         if self.swapped:
             self.bitstream_raw=symbol_reverse(self.bitstream_raw)
         self.symbols=len(self.bitstream_raw)//2
-        if m.group(13):
-            self.extra_data=m.group(13)
+        if g[12]:
+            self.extra_data=g[12]
             self._new_error("There is crap at the end in extra_data")
 
         # Make a "global" timestamp - needs to be an int to avoid precision loss
-        # Current format:
-        mm=re.match(r"i-(\d+)-t1$",self.filename)
-        if mm:
-            startts=int(mm.group(1))
-            self.fileinfo="p-%d"%startts
-            self.globalns=startts*(10**9)+int(float(self.timestamp)*(10**6))
-            return
-        # Older file formats:
-        mm=re.match(r"(\d\d)-(\d\d)-(20\d\d)T(\d\d)-(\d\d)-(\d\d)-[sr]1",self.filename)
-        if mm:
-            month, day, year, hour, minute, second = map(int, mm.groups())
-            ts=datetime.datetime(year,month,day,hour,minute,second)
-            startts=int(ts.timestamp())
-            self.fileinfo="p-%d"%startts
-            self.globalns=startts*(10**9)+int(float(self.timestamp)*(10**6))
-            return
-        mm=re.match(r"i-(\d+(?:\.\d+)?)-[vbsrtl]1.([a-z])([a-z])",self.filename)
-        if mm:
-            self.b26=(ord(mm.group(2))-ord('a'))*26+ ord(mm.group(3))-ord('a')
-            startts=float(mm.group(1))+self.b26*600
-            if startts != int(startts):
-                self.timestamp+=(startts%1)*(10**3)
-            startts=int(startts)
-            self.fileinfo="p-%d"%startts
-            self.globalns=startts*(10**9)+int(float(self.timestamp)*(10**6))
-            return
-        mm=re.match(r"i-(\d+(?:\.\d+)?)-[vbsrtl]1(?:-o[+-]\d+)?$",self.filename)
-        if mm:
-            startts=float(mm.group(1))
-            if startts != int(startts):
-                self.timestamp+=(startts%1)*(10**3)
-            startts=int(startts)
-            self.fileinfo="p-%d"%startts
+        (startts, tsadd, fileinfo, b26)=file_start(self.filename)
+        if b26 is not None:
+            self.b26=b26
+        self.fileinfo=fileinfo
+        if startts is not None:
+            if tsadd:
+                self.timestamp+=tsadd
             self.globalns=startts*(10**9)+int(float(self.timestamp)*(10**6))
             return
 
-        global tswarning,tsoffset,maxts
-        self.fileinfo="u-"+self.filename.replace("-",".")
-        if not tswarning:
-            print("Warning: no timestamp found in filename", file=sys.stderr)
-            tswarning=True
-        ts=tsoffset+float(self.timestamp)/1000
-        if ts<maxts:
-            tsoffset=maxts
-            ts=tsoffset+float(self.timestamp)/1000
-        maxts=ts
+        ts=parser.untimed_ts(float(self.timestamp))
         self.globalns=int(ts*(10**9))
 
+    def _fmt_freq(self):
+        args=self.parser.args
+        if args.channelize:
+            self.freq_print=channelize_str(self.frequency)
+        else:
+            self.freq_print="%010d"%(self.frequency)
+    freq_print=lazy(_fmt_freq)
+
     def upgrade(self):
+        args=self.parser.args
         if self.error: return self
         if(not self.next and self.bitstream_raw.startswith(iridium_access)):
             self.uplink=0
@@ -201,7 +317,9 @@ class Message(object):
             msg=cls + ": "+msg
         if not self.error_msg or self.error_msg[-1] != msg:
             self.error_msg.append(msg)
-    def _pretty_header(self):
+    def _pretty_name(self):
+        """Name field of pretty(): file info and error correction flags"""
+        args=self.parser.args
         flags=""
         if args.uwec or args.harder or not args.perfect:
             flags="-e"
@@ -222,7 +340,9 @@ class Message(object):
                     flags+="%d"%self.fixederrs
             else:
                 flags+="0"
-        hdr="%s%s %014.4f"%(self.fileinfo,flags,self.timestamp)
+        return self.fileinfo+flags
+    def _pretty_header(self):
+        hdr="%s %014.4f"%(self._pretty_name(),self.timestamp)
         if "snr" not in self.__dict__:
             return "%s %s %3d%% %7.3f"%(hdr,self.freq_print,self.confidence,self.level)
         else:
@@ -252,9 +372,216 @@ class Message(object):
         str+=self._pretty_trailer()
         return str
 
+class FrameRecord(object):
+    # Compact copy of a frame for the output modes that buffer everything
+    # until the end (-o sat/err/plot). Keeps only what those need instead of
+    # the whole (upgraded) message __dict__ with all its intermediate bits.
+    __slots__=('frequency', 'globalns', 'error_msg', 'line', 'values', 'satno', 'fdiff')
+
+    def __init__(self, msg, fields=(), pretty=True):
+        self.frequency=getattr(msg, 'frequency', None)
+        self.globalns=getattr(msg, 'globalns', None)
+        self.error_msg=tuple(msg.error_msg[:1])
+        self.line=msg.pretty() if pretty else None
+        self.values=tuple(getattr(msg, f) for f in fields)
+
+    def pretty(self):
+        return self.line
+
+# Type detection of IridiumMessage (without --harder), split out so
+# make_prefilter() can use it on raw lines
+def band_ok(msgtype, frequency, uplink, freqclass=True):
+    if msgtype in ("MS", "TL", "RA"):
+        return not freqclass or (frequency > f_simplex and not uplink)
+    if msgtype=="BC":
+        return not freqclass or (frequency < f_duplex and not uplink)
+    if msgtype=="LW":
+        return not freqclass or frequency < f_duplex
+    if msgtype=="AQ":
+        return (not freqclass or frequency < f_duplex) and uplink
+    raise AssertionError("unknown frame type")
+
+def is_ms(data):
+    return data[:32] == header_messaging
+
+def is_tl(data):
+    return data[:96] == header_time_location
+
+def is_bc(data):
+    hdrlen=6
+    blocklen=64
+    if len(data)>hdrlen+blocklen:
+        if ndivide(hdr_poly,data[:hdrlen])==0:
+            (o_bc1,o_bc2)=de_interleave(data[hdrlen:hdrlen+blocklen])
+            if ndivide(ringalert_bch_poly,o_bc1[:31])==0:
+                if ndivide(ringalert_bch_poly,o_bc2[:31])==0:
+                    return True
+    return False
+
+def is_lw(data):
+    if len(data)>64: # XXX: heuristic based on LCW / first BCH block, can we do better?
+        (o_lcw1,o_lcw2,o_lcw3)=de_interleave_lcw(data[:46])
+        if ndivide( 29,o_lcw1)==0:
+            if ndivide( 41,o_lcw3)==0:
+                (e2,lcw2,bch)= bch_repair(465,o_lcw2+'0')  # One bit missing, so we guess
+                if (e2==1): # Maybe the other one...
+                    (e2,lcw2,bch)= bch_repair(465,o_lcw2+'1')
+                return e2==0
+    return False
+
+def is_ra(data):
+    firstlen=3*32
+    if len(data)>=firstlen:
+        (o_ra1,o_ra2,o_ra3)=de_interleave3(data[:firstlen])
+        if ndivide(ringalert_bch_poly,o_ra1[:31])==0:
+            if ndivide(ringalert_bch_poly,o_ra2[:31])==0:
+                if ndivide(ringalert_bch_poly,o_ra3[:31])==0:
+                    return True
+    return False
+
+def is_aq(data):
+    return len(data)>=2*26 and len(data)<2*50
+
+# options for a Parser created without commandline arguments
+default_opts = {
+    'harder': False,
+    'uwec': False,
+    'perfect': False,
+    'freqclass': True,
+    'forcetype': None,
+    'channelize': False,
+    'errorfile': None,
+    'linefilter': {'type': 'All', 'attr': None, 'check': None},
+}
+
+class Parser(object):
+    """Parses RAW lines into messages.
+
+    Holds the options (the argparse namespace of iridium-parser.py, or
+    default_opts updated with keyword arguments) and the timestamp state
+    for files without start time, so differently configured parsers can be
+    used side by side. A namespace passed without keyword arguments is
+    shared with the caller, otherwise it is copied first.
+    A single Parser is not thread safe.
+    """
+    def __init__(self, args=None, eager_fields=False, **opts):
+        if args is None:
+            args=argparse.Namespace(**copy.deepcopy(default_opts))
+        elif opts:
+            args=argparse.Namespace(**vars(args))
+        vars(args).update(opts)
+        self.args=args
+        # decode lazy fields right away (for output modes which use the whole __dict__)
+        self.eager_fields=eager_fields
+        self.lineno=0
+        self.tswarning=False
+        self.tsoffset=0
+        self.maxts=0
+
+    def parse_line(self, line, lineno=None):
+        """Parse a single line, returns the (upgraded) message"""
+        if lineno is None:
+            lineno=self.lineno+1
+        self.lineno=lineno
+        return Message(line.strip(), lineno, self).upgrade()
+
+    def parse_iter(self, lines):
+        """Parse lines as they come in, yields one message per line"""
+        for line in lines:
+            yield self.parse_line(line)
+
+    def parse_many(self, lines):
+        """Parse a list of lines, returns a list of messages"""
+        return [self.parse_line(line) for line in lines]
+
+    def untimed_ts(self, timestamp):
+        # Files without start time: make timestamps monotonic across restarts
+        if not self.tswarning:
+            print("Warning: no timestamp found in filename", file=sys.stderr)
+            self.tswarning=True
+        ts=self.tsoffset+timestamp/1000
+        if ts<self.maxts:
+            self.tsoffset=self.maxts
+            ts=self.tsoffset+timestamp/1000
+        self.maxts=ts
+        return ts
+
+    def track_time(self, lines):
+        """Replay the timestamp tracking of Message() without parsing the lines"""
+        for line in lines:
+            if not isinstance(line, tuple):
+                try:
+                    _, filename, _ = line.split(None, 2)
+                except ValueError:
+                    continue
+                if filename=="/dev/stdin":
+                    filename="-"
+                if has_starttime(filename):
+                    continue
+                # only lines Message() can parse advance the time
+                line=raw_groups(line)
+                if line is None:
+                    continue
+            filename=line[1]
+            if filename=="/dev/stdin":
+                filename="-"
+            if not has_starttime(filename):
+                self.untimed_ts(float(line[2]))
+
+    def make_prefilter(self, cls):
+        """Return a function which cheaply rejects raw lines that can not be
+        parsed into a message of class cls, or None if that is not possible.
+
+        Rejected lines still advance the timestamps of files without start time.
+        """
+        args=self.args
+        if args.forcetype or args.harder or args.uwec:
+            return None
+        for (base, msgtype, detect) in (
+                (IridiumMSMessage,     "MS", is_ms),
+                (IridiumSTLMessage,    "TL", is_tl),
+                (IridiumBCMessage,     "BC", is_bc),
+                (IridiumRAMessage,     "RA", is_ra),
+                (IridiumLCWMessage,    "LW", is_lw),
+                (IridiumLCWECCMessage, "LW", is_lw),
+                (IridiumAQMessage,     "AQ", is_aq),
+                ):
+            if issubclass(cls, base):
+                break
+        else:
+            return None
+
+        def prefilter(line):
+            g=raw_groups(line)
+            if g is None: # Message() would fail, too
+                return False
+            bits=g[11]
+            if g[0]!="RWA":
+                bits=symbol_reverse(bits)
+            if g[0]=="NC1":
+                return reject(g)
+            elif bits.startswith(iridium_access):
+                uplink=0
+            elif bits.startswith(uplink_access):
+                uplink=1
+            else:
+                return reject(g)
+            if not band_ok(msgtype, int(g[3]), uplink, args.freqclass) or not detect(bits[len(iridium_access):]):
+                return reject(g)
+            return True
+
+        def reject(g):
+            if not has_starttime(g[1]):
+                self.untimed_ts(float(g[2]))
+            return False
+
+        return prefilter
+
 class IridiumMessage(Message):
+    frametype="IRI"
     def __init__(self,msg):
         self.__dict__=msg.__dict__
+        args=self.parser.args
         if self.next:
             data = self.bitstream_raw[len(next_access_dl):]
             self.msgtype = "NX"
@@ -269,66 +596,48 @@ class IridiumMessage(Message):
         # Try to detect packet type.
         # Will not detect packets with correctable bit errors at the beginning
         # unless '--harder' is specifed
-        if "msgtype" not in self.__dict__ and (not args.freqclass or self.frequency > f_simplex) and not (args.freqclass and self.uplink):
-            if data[:32] == header_messaging:
+        if "msgtype" not in self.__dict__ and band_ok("MS", self.frequency, self.uplink, args.freqclass):
+            if is_ms(data):
                 self.msgtype="MS"
 
         if "msgtype" not in self.__dict__ and args.linefilter['type'] == "IridiumMSMessage":
             self._new_error("filtered message")
             return
 
-        if "msgtype" not in self.__dict__ and (not args.freqclass or self.frequency > f_simplex) and not (args.freqclass and self.uplink):
-            if data[:96]==header_time_location:
+        if "msgtype" not in self.__dict__ and band_ok("TL", self.frequency, self.uplink, args.freqclass):
+            if is_tl(data):
                 self.msgtype="TL"
 
         if "msgtype" not in self.__dict__ and args.linefilter['type'] == "IridiumSTLMessage":
             self._new_error("filtered message")
             return
 
-        if "msgtype" not in self.__dict__ and (not args.freqclass or self.frequency < f_duplex) and not (args.freqclass and self.uplink):
-            hdrlen=6
-            blocklen=64
-            if len(data)>hdrlen+blocklen:
-                if ndivide(hdr_poly,data[:hdrlen])==0:
-                    (o_bc1,o_bc2)=de_interleave(data[hdrlen:hdrlen+blocklen])
-                    if ndivide(ringalert_bch_poly,o_bc1[:31])==0:
-                        if ndivide(ringalert_bch_poly,o_bc2[:31])==0:
-                            self.msgtype="BC"
+        if "msgtype" not in self.__dict__ and band_ok("BC", self.frequency, self.uplink, args.freqclass):
+            if is_bc(data):
+                self.msgtype="BC"
 
         if "msgtype" not in self.__dict__ and args.linefilter['type'] == "IridiumBCMessage":
             self._new_error("filtered message")
             return
 
-        if "msgtype" not in self.__dict__ and (not args.freqclass or self.frequency < f_duplex):
-            if len(data)>64: # XXX: heuristic based on LCW / first BCH block, can we do better?
-                (o_lcw1,o_lcw2,o_lcw3)=de_interleave_lcw(data[:46])
-                if ndivide( 29,o_lcw1)==0:
-                    if ndivide( 41,o_lcw3)==0:
-                        (e2,lcw2,bch)= bch_repair(465,o_lcw2+'0')  # One bit missing, so we guess
-                        if (e2==1): # Maybe the other one...
-                            (e2,lcw2,bch)= bch_repair(465,o_lcw2+'1')
-                        if e2==0:
-                            self.msgtype="LW"
+        if "msgtype" not in self.__dict__ and band_ok("LW", self.frequency, self.uplink, args.freqclass):
+            if is_lw(data):
+                self.msgtype="LW"
 
         if "msgtype" not in self.__dict__ and args.linefilter['type'] == "IridiumLCWMessage":
             self._new_error("filtered message")
             return
 
-        if "msgtype" not in self.__dict__ and (not args.freqclass or self.frequency > f_simplex) and not (args.freqclass and self.uplink):
-            firstlen=3*32
-            if len(data)>=3*32:
-                (o_ra1,o_ra2,o_ra3)=de_interleave3(data[:firstlen])
-                if ndivide(ringalert_bch_poly,o_ra1[:31])==0:
-                    if ndivide(ringalert_bch_poly,o_ra2[:31])==0:
-                        if ndivide(ringalert_bch_poly,o_ra3[:31])==0:
-                            self.msgtype="RA"
+        if "msgtype" not in self.__dict__ and band_ok("RA", self.frequency, self.uplink, args.freqclass):
+            if is_ra(data):
+                self.msgtype="RA"
 
         if "msgtype" not in self.__dict__ and args.linefilter['type'] == "IridiumRAMessage":
             self._new_error("filtered message")
             return
 
-        if "msgtype" not in self.__dict__ and (not args.freqclass or self.frequency < f_duplex) and self.uplink:
-            if len(data)>=2*26 and len(data)<2*50:
+        if "msgtype" not in self.__dict__ and band_ok("AQ", self.frequency, self.uplink, args.freqclass):
+            if is_aq(data):
                 self.msgtype="AQ"
 
         if "msgtype" not in self.__dict__:
@@ -380,13 +689,13 @@ class IridiumMessage(Message):
 
                 # try ITL
                 if "msgtype" not in self.__dict__ and len(data)>=96+(8*8*12) and not (args.freqclass and self.uplink):
-                    if bitdiff(data[:96],header_time_location)<4:
+                    if intdiff(int(data[:96],2),int_header_time_location)<4:
                         self.ec_lcw=1
                         self.msgtype="TL"
 
                 # try IMS
                 if "msgtype" not in self.__dict__ and len(data)>=32 and not (args.freqclass and self.uplink):
-                    if bitdiff(data[:32],header_messaging)<2:
+                    if intdiff(int(data[:32],2),int_header_messaging)<2:
                         self.ec_lcw=1
                         self.msgtype="MS"
 
@@ -522,7 +831,7 @@ class IridiumMessage(Message):
             str+= " descr_extra:"+self.descramble_extra
         return str
     def pretty(self):
-        sstr= "IRI: "+self._pretty_header()
+        sstr= self.frametype+": "+self._pretty_header()
         sstr+= " %2s"%self.msgtype
         if self.msgtype == "TL" and "i" in self.__dict__:
             sstr+= " <"+" ".join(self.i)+">"
@@ -537,12 +846,15 @@ class IridiumMessage(Message):
 class IridiumLCWMessage(IridiumMessage):
     def __init__(self,msg):
         self.__dict__=msg.__dict__
+        args=self.parser.args
 
         if args.forcetype and ':' in args.forcetype:
             self.ft=int(args.forcetype.partition(':')[2])
 
         data=self.descrambled
-        self.pretty_lcw()
+        self.lcw_ft=int(self.lcw2[:2],2)
+        self.lcw_code=int(self.lcw2[2:],2)
+        self.__dict__.pop('header', None) # formatted on access by pretty_lcw()
 
         if self.ft<=3 and len(data)<312:
             self._new_error("Not enough data in data packet")
@@ -594,6 +906,7 @@ class IridiumLCWMessage(IridiumMessage):
             self._new_error("No data to descramble")
 
     def upgrade(self):
+        args=self.parser.args
         if args.linefilter['type']=='IridiumLCW3Message' and self.msgtype!="U3":
             self._new_error("filtered message")
         if self.error: return self
@@ -689,9 +1002,10 @@ class IridiumLCWMessage(IridiumMessage):
             code="<%d>"%(self.lcw_code)
         self.header="LCW(%d,T:%s,C:%s,%s)"%(self.ft,ty,code,lcw3bits)
         self.header="%-110s "%self.header
+    header=lazy(pretty_lcw)
 
     def pretty(self):
-        sstr= "IRI: "+self._pretty_header()
+        sstr= self.frametype+": "+self._pretty_header()
         sstr+= " %2s"%self.msgtype
         if self.descrambled!="":
             sstr+= " ["
@@ -701,6 +1015,7 @@ class IridiumLCWMessage(IridiumMessage):
         return sstr
 
 class IridiumSYMessage(IridiumLCWMessage):
+    frametype="ISY"
     def __init__(self,imsg):
         self.__dict__=imsg.__dict__
     def upgrade(self):
@@ -714,7 +1029,7 @@ class IridiumSYMessage(IridiumLCWMessage):
                 self.pattern="10"
         return self
     def pretty(self):
-        str= "ISY: "+self._pretty_header()
+        str= self.frametype+": "+self._pretty_header()
         if self.fixederrs==0:
             str+=" Sync=OK"
         else:
@@ -728,6 +1043,7 @@ class IridiumSYMessage(IridiumLCWMessage):
 
 iaq_crc16=crcmod.mkCrcFun(poly=0x15101,initCrc=0,rev=False,xorOut=0)
 class IridiumAQMessage(IridiumMessage):
+    frametype="IAQ"
     def __init__(self,imsg):
         self.__dict__=imsg.__dict__
         self.fixederrs=0
@@ -750,7 +1066,7 @@ class IridiumAQMessage(IridiumMessage):
     def upgrade(self):
         return self
     def pretty(self):
-        st= "IAQ: "+self._pretty_header()
+        st= self.frametype+": "+self._pretty_header()
 
         st+= " " + "".join(self.sym[0:4])
         st+= " " + "Rid:%03d"%self.rid
@@ -765,8 +1081,10 @@ class IridiumAQMessage(IridiumMessage):
 
 
 class IridiumSTLMessage(IridiumMessage):
+    frametype="ITL"
     def __init__(self,imsg):
         self.__dict__=imsg.__dict__
+        args=self.parser.args
         if not args.forcetype:
             self.header="<11>"
         else:
@@ -787,7 +1105,8 @@ class IridiumSTLMessage(IridiumMessage):
 
         if args.harder:
             MAX_DIFF=10
-            self.ib=[bin(int(x, 16))[2:].zfill(len(x*4)) for x in self.i]
+            ib=[int(x, 16) for x in self.i]
+            self.ib=[format(x, "0%db"%(len(s)*4)) for (x, s) in zip(ib, self.i)]
 
         # Try to determine ITL version
         self.itl_version= None
@@ -795,7 +1114,7 @@ class IridiumSTLMessage(IridiumMessage):
             self.itl_version= itl.PRS_HDR.index(self.i[0])
         except ValueError:
             if args.harder: # harder only supports V2
-                if bitdiff(self.ib[0],itl.BIN_HDR[2])<MAX_DIFF:
+                if intdiff(ib[0],itl.INT_HDR[2])<MAX_DIFF:
                     self.fixederrs+= 1
                     self.itl_version= 2
                 else:
@@ -855,8 +1174,8 @@ class IridiumSTLMessage(IridiumMessage):
             if self.i[1] in itl.MAP_PLANE:
                 self.plane= itl.MAP_PLANE[self.i[1]]
             else:
-                for i,p in enumerate(itl.BIN_PLANES):
-                    if bitdiff(self.ib[1],p)<MAX_DIFF*2:
+                for i,p in enumerate(itl.INT_PLANES):
+                    if intdiff(ib[1],p)<MAX_DIFF*2:
                         self.plane=i+1
                         self.fixederrs+=1
                         break
@@ -873,7 +1192,7 @@ class IridiumSTLMessage(IridiumMessage):
                     self.msg[qidx]= itl.MAP_PRS[self.q[qidx]]
                     cat=itl.MAP_PRS_TYPE[self.q[qidx]]
                 else:
-                    q=bin(int(self.q[qidx], 16))[2:].zfill(len(self.q[qidx]*4))
+                    q=int(self.q[qidx], 16)
                     if qidx==0: # Only search in correct PRS subset
                         if self.plane%2==0:
                             s=0
@@ -891,8 +1210,8 @@ class IridiumSTLMessage(IridiumMessage):
                         e=128*(cat+1)
                     else:
                         raise AssertionError("ITL category error")
-                    for i,prs in enumerate(itl.BIN_PRS[s:e]):
-                        dist=bitdiff(q,prs)
+                    for i,prs in enumerate(itl.INT_PRS[s:e]):
+                        dist=intdiff(q,prs)
                         if dist<mindist: mindist=dist
                         if dist<MAX_DIFF:
                             self.msg[qidx]=i%128
@@ -915,7 +1234,7 @@ class IridiumSTLMessage(IridiumMessage):
     def upgrade(self):
         return self
     def pretty(self):
-        st= "ITL: "+self._pretty_header()
+        st= self.frametype+": "+self._pretty_header()
 
         if self.itl_version==0:
             st+= " -"
@@ -942,6 +1261,7 @@ class IridiumSTLMessage(IridiumMessage):
         return st
 
 class IridiumLCW3Message(IridiumLCWMessage):
+    frametype=property(lambda self: self.utype)
     def __init__(self,imsg):
         self.__dict__=imsg.__dict__
 
@@ -976,7 +1296,7 @@ class IridiumLCW3Message(IridiumLCWMessage):
     def upgrade(self):
         return self
     def pretty(self):
-        str= self.utype+": "+self._pretty_header()
+        str= self.frametype+": "+self._pretty_header()
         if self.utype=='I38':
             if self.rs8p:
                 str+=" RS8=OK"
@@ -1029,6 +1349,7 @@ class IridiumLCW3Message(IridiumLCWMessage):
         return str
 
 class IridiumVOMessage(IridiumLCWMessage):
+    frametype=property(lambda self: self.vtype)
     def __init__(self,imsg):
         self.__dict__=imsg.__dict__
 
@@ -1080,7 +1401,7 @@ class IridiumVOMessage(IridiumLCWMessage):
             return new
         return self
     def pretty(self):
-        str= self.vtype+": "+self._pretty_header()
+        str= self.frametype+": "+self._pretty_header()
         if self.vtype=="VDA":
             raise AssertionError("VDA handled in IIP")
         elif self.vtype=="VO6":
@@ -1098,6 +1419,7 @@ class IridiumVOMessage(IridiumLCWMessage):
 # Poly from GSM 04.64 / check value (reversed) is 0xC91B6
 iip_crc24=crcmod.mkCrcFun(poly=0x1BBA1B5,initCrc=0xffffff^0x0c91b6,rev=True,xorOut=0x0c91b6)
 class IridiumIPMessage(IridiumLCWMessage):
+    frametype=property(lambda self: self.itype)
     def __init__(self,imsg):
         self.__dict__=imsg.__dict__
 
@@ -1140,7 +1462,7 @@ class IridiumIPMessage(IridiumLCWMessage):
     def upgrade(self):
         return self
     def pretty(self):
-        s= self.itype+": "+self._pretty_header()
+        s= self.frametype+": "+self._pretty_header()
         if self.itype=="IIP" or self.itype=="VDA":
             s+= " type:%02x seq=%03d ack=%03d cs=%03d/%s "%(self.ip_hdr,self.ip_seq,self.ip_ack,self.ip_cs,["no","OK"][(self.ip_cs_ok==255)])
             if self.ip_hdr==4: # DATA
@@ -1187,8 +1509,10 @@ class IridiumIPMessage(IridiumLCWMessage):
         return s
 
 class IridiumECCMessage(IridiumMessage):
+    frametype="IME"
     def __init__(self,imsg):
         self.__dict__=imsg.__dict__
+        args=self.parser.args
         if self.msgtype == "MS":
             self.poly=messaging_bch_poly
         elif self.msgtype == "RA":
@@ -1198,7 +1522,6 @@ class IridiumECCMessage(IridiumMessage):
         else:
             raise AssertionError("unknown Iridium message type")
 
-        self.bitstream_bch=""
         self.fixederrs=0
         self.fill=0
         self.ecc_cut=False
@@ -1224,13 +1547,16 @@ class IridiumECCMessage(IridiumMessage):
 
             if self.fill>0: self.descramble_extra=""
 
+        bchlen=self.poly.bit_length()-1
+        bch_val=0
+        bch_len=0
         for block in self.descrambled:
             assert len(block)==32, "unknown BCH block len:%d"%len(block)
 
-            parity=block[31:]
-            block=block[:31]
+            block=int(block,2)
+            parity=block&1
 
-            (errs,data,bch)=bch_repair(self.poly, block)
+            (errs,block)=nnrepair(self.poly, block>>1)
 
             if errs<0: # cut packet on uncorrectable error
                 self.ecc_cut=True
@@ -1238,7 +1564,7 @@ class IridiumECCMessage(IridiumMessage):
                 self.descramble_extra=""
                 break
 
-            if ((data+bch+parity).count('1') % 2)==1:
+            if (bin(block).count('1')+parity) % 2==1:
                 if args.harder:
                     errs+=1
                 else:
@@ -1252,7 +1578,10 @@ class IridiumECCMessage(IridiumMessage):
             if errs>0:
                 self.fixederrs+=1
 
-            self.bitstream_bch+=data # TBD: keep blocks?
+            bch_val=(bch_val<<(31-bchlen)) | (block>>bchlen) # TBD: keep blocks?
+            bch_len+=31-bchlen
+
+        self.bitstream_bch=Bits(bch_val, bch_len)
 
         if len(self.bitstream_bch) == 0:
             self._new_error("BCH decode failed")
@@ -1273,7 +1602,7 @@ class IridiumECCMessage(IridiumMessage):
             return self
         return self
     def pretty(self):
-        str= "IME: "+self._pretty_header()+" "+self.msgtype+" "
+        str= self.frametype+": "+self._pretty_header()+" "+self.msgtype+" "
         for block in range(len(self.descrambled)):
             b=self.descrambled[block]
             (errs,foo)=nrepair(self.poly,b[:31])
@@ -1286,6 +1615,7 @@ class IridiumECCMessage(IridiumMessage):
         return str
 
 class IridiumLCWECCMessage(IridiumMessage):
+    frametype="IME"
     def __init__(self,imsg):
         self.__dict__=imsg.__dict__
         if self.msgtype == "DA":
@@ -1293,13 +1623,15 @@ class IridiumLCWECCMessage(IridiumMessage):
         else:
             raise AssertionError("unknown Iridium message type")
 
-        self.bitstream_bch=""
         self.fixederrs=0
 
+        bchlen=self.poly.bit_length()-1
+        bch_val=0
+        bch_len=0
         for block in self.descrambled:
             assert len(block)==31, "unknown BCH block len:%d"%len(block)
 
-            (errs,data,bch)=bch_repair(self.poly, block)
+            (errs,block)=nnrepair(self.poly, int(block,2))
 
             if errs<0:
                 self.descramble_extra=""
@@ -1308,11 +1640,16 @@ class IridiumLCWECCMessage(IridiumMessage):
             if errs>0:
                 self.fixederrs+=1
 
-            self.bitstream_bch+=data
+            bch_val=(bch_val<<(31-bchlen)) | (block>>bchlen)
+            bch_len+=31-bchlen
+
+        self.bitstream_bch=Bits(bch_val, bch_len)
 
         if len(self.bitstream_bch)==0:
             self._new_error("BCH decode failed")
 
+    header=lazy(IridiumLCWMessage.pretty_lcw)
+
     def upgrade(self):
         if self.error: return self
         try:
@@ -1325,7 +1662,7 @@ class IridiumLCWECCMessage(IridiumMessage):
             return self
         return self
     def pretty(self):
-        str= "IME: "+self._pretty_header()+" "+self.msgtype+" "
+        str= self.frametype+": "+self._pretty_header()+" "+self.msgtype+" "
         for block in range(len(self.descrambled)):
             b=self.descrambled[block]
             (errs,foo)=nrepair(self.poly,b)
@@ -1337,42 +1674,41 @@ class IridiumLCWECCMessage(IridiumMessage):
 
 ida_crc16=crcmod.predefined.mkPredefinedCrcFun("crc-ccitt-false")
 class IridiumDAMessage(IridiumLCWECCMessage):
+    frametype="IDA"
     def __init__(self,imsg):
         self.__dict__=imsg.__dict__
         # Decode stuff from self.bitstream_bch
-        self.flags1=self.bitstream_bch[:4]
-        self.flag1b=self.bitstream_bch[4:5]
-        self.da_ctr=int(self.bitstream_bch[5:8],2)
-        self.flags2=self.bitstream_bch[8:11]
-        self.da_len=int(self.bitstream_bch[11:16],2)
-        self.flags3=int(self.bitstream_bch[16:17],2)
-        self.zero1=int(self.bitstream_bch[17:20],2)
+        bits=self.bitstream_bch
+        self.flags1=bits.bin(0,4)
+        self.flag1b=bits.bin(4,5)
+        self.da_ctr=bits.uint(5,8)
+        self.flags2=bits.bin(8,11)
+        self.da_len=bits.uint(11,16)
+        self.flags3=bits.uint(16,17)
+        self.zero1=bits.uint(17,20)
         if self.zero1 != 0:
             self._new_error("zero1 not 0")
 
-        if len(self.bitstream_bch) < 9*20+16:
+        if len(bits) < 9*20+16:
             raise ParserError("Not enough data in data packet")
 
         if self.da_len>0:
-            self.da_crc=int(self.bitstream_bch[9*20:9*20+16],2)
-            self.da_ta=[int(x,2) for x in slice(self.bitstream_bch[20:9*20],8)]
-            crcstream=self.bitstream_bch[:20]+"0"*12+self.bitstream_bch[20:-4]
+            self.da_crc=bits.uint(9*20,9*20+16)
+            self.da_ta=list(bits[20:9*20].tobytes())
+            crcstream=bits[:20]+Bits(0,12)+bits[20:-4]
 #            the_crc=ida_crc16("".join([chr(int(x,2)) for x in slice(crcstream,8)]))
-            the_crc=ida_crc16(bytes([int(x,2) for x in slice(crcstream,8)]))
+            the_crc=ida_crc16(crcstream.tobytes())
             self.the_crc=the_crc
             self.crc_ok=(the_crc==0)
         else:
             self.crc_ok=False
-            self.da_ta=[int(x,2) for x in slice(self.bitstream_bch[20:11*20],8)]
+            self.da_ta=list(bits[20:11*20].tobytes())
 
-        self.zero2=int(self.bitstream_bch[9*20+16:],2)
+        self.zero2=bits.uint(9*20+16)
         if self.zero2 != 0:
             self._new_error("zero2 not 0")
 
-        sbd= self.bitstream_bch[1*20:9*20]
-        self.data=[]
-        for x in slice(sbd, 8):
-            self.data+=[int(x,2)]
+        self.data=list(bits[1*20:9*20].tobytes())
 
     def upgrade(self):
         if self.error: return self
@@ -1383,14 +1719,15 @@ class IridiumDAMessage(IridiumLCWECCMessage):
             return self
         return self
     def pretty(self):
-        str= "IDA: "+self._pretty_header()
-        str+= " "+self.bitstream_bch[:3]
-        str+= " cont="+self.bitstream_bch[3:4]
-        str+= " "+self.bitstream_bch[4:5]
-        str+= " ctr="+self.bitstream_bch[5:8]
-        str+= " "+self.bitstream_bch[8:11]
+        bits=self.bitstream_bch
+        str= self.frametype+": "+self._pretty_header()
+        str+= " "+bits.bin(0,3)
+        str+= " cont="+bits.bin(3,4)
+        str+= " "+bits.bin(4,5)
+        str+= " ctr="+bits.bin(5,8)
+        str+= " "+bits.bin(8,11)
         str+= " len=%02d"%self.da_len
-        str+= " 0:"+self.bitstream_bch[16:20]
+        str+= " 0:"+bits.bin(16,20)
         str+=" ["
         if self.da_len>0:
             if all([x==0 for x in self.da_ta[self.da_len+1:]]):
@@ -1404,23 +1741,20 @@ class IridiumDAMessage(IridiumLCWECCMessage):
         str+= "%-60s"%(mstr+"]")
 
         if self.da_len>0:
-            str+= " %04x"%int(self.bitstream_bch[9*20:9*20+16],2)
+            str+= " %04x"%self.da_crc
             str+="/%04x"%self.the_crc
             if self.crc_ok:
                 str+=" CRC:OK"
             else:
                 str+=" CRC:no"
-            str+= " "+self.bitstream_bch[9*20+16:]
+            str+= " "+bits.bin(9*20+16)
         else:
             str+="  ---   "
-            str+= " "+self.bitstream_bch[9*20+16:]
+            str+= " "+bits.bin(9*20+16)
 
         if self.da_len>0:
-            sbd= self.bitstream_bch[1*20:9*20]
-
             str+=' SBD: '
-            for x in slice(sbd, 8):
-                c=int(x,2)
+            for c in self.data:
                 if( c>=32 and c<127):
                     str+=chr(c)
                 else:
@@ -1430,9 +1764,10 @@ class IridiumDAMessage(IridiumLCWECCMessage):
         return str
 
 class IridiumBCMessage(IridiumECCMessage):
+    frametype="IBC"
     def __init__(self,imsg):
         self.__dict__=imsg.__dict__
-        blocks, _ =slice_extra(self.bitstream_bch,42)
+        blocks, _ =self.bitstream_bch.split(42)
 
         if len(blocks)>4: # IBC is exactly 4 "blocks" long
             blocks=blocks[:4]
@@ -1445,62 +1780,76 @@ class IridiumBCMessage(IridiumECCMessage):
         if blocks and self.bc_type == 0:
             data = blocks.pop(0)
 
-            self.sv_id =         int(data[ 0: 7], 2)
-            self.beam_id =       int(data[ 7:13], 2)
-            self.unknown01 =         data[13:14]
-            self.slot =          int(data[14:15], 2) # previously: timeslot
-            self.sv_blocking =   int(data[15:16], 2) # aka: Acq
-            self.acqu_classes =      data[16:32]
-            self.acqu_subband =  int(data[32:37], 2)
-            self.acqu_channels = int(data[37:40], 2)
-            self.unknown02 =         data[40:42]
+            self.sv_id =         data.uint( 0, 7)
+            self.beam_id =       data.uint( 7,13)
+            self.unknown01 =     data.bin (13,14)
+            self.slot =          data.uint(14,15) # previously: timeslot
+            self.sv_blocking =   data.uint(15,16) # aka: Acq
+            self.acqu_classes =  data.bin (16,32)
+            self.acqu_subband =  data.uint(32,37)
+            self.acqu_channels = data.uint(37,40)
+            self.unknown02 =     data.bin (40,42)
 
         if blocks and self.bc_type == 0:
             data = blocks.pop(0)
 
-            self.type = int(data[0:6], 2)
+            self.type = data.uint(0,6)
             if self.type == 0:
-                self.unknown11 = data[6:36]
-                self.max_uplink_pwr = int(data[36:42], 2)
+                self.unknown11 = data.bin(6,36)
+                self.max_uplink_pwr = data.uint(36,42)
             elif self.type == 1:
-                self.unknown21 = data[6:10]
-                self.iri_time = int(data[10:42], 2) # a.k.a. LBFC (L-Band Frame Counter)
-                (self.iri_time_ux, self.iri_time_str)= fmt_iritime(self.iri_time)
+                self.unknown21 = data.bin(6,10)
+                self.iri_time = data.uint(10,42) # a.k.a. LBFC (L-Band Frame Counter)
+                if self.parser.eager_fields:
+                    self._fmt_iri_time()
             elif self.type == 2:
-                self.unknown31 = data[6:10]
-                self.tmsi_expiry = int(data[10:42], 2)
-                (self.tmsi_expiry_ux, self.tmsi_expiry_str)= fmt_iritime(self.tmsi_expiry)
+                self.unknown31 = data.bin(6,10)
+                self.tmsi_expiry = data.uint(10,42)
+                if self.parser.eager_fields:
+                    self._fmt_tmsi_expiry()
             else: # Unknown Type
-                self.type_data=data
+                self.type_data=str(data)
 
         self.assignments=[]
         for data in blocks: # Parse assignments (if any)
             assignment={
-                'type':      int(data[ 0: 3], 2),
+                'type':        data.uint( 0, 3),
             }
             if assignment['type'] == 0: # "classic" assignment
                 assignment = {
                     **assignment,
-                    'random_id':   int(data[ 3:11], 2),
-                    'timeslot':  1+int(data[11:13], 2),
-                    'ul_sb':       int(data[13:18], 2), # uplink_subband
-                    'dl_sb':       int(data[18:23], 2), # downlink_subband
-                    'access':    1+int(data[23:26], 2),
-                    'dtoa':        int(data[26:34], 2),
-                    'dfoa':        int(data[34:40], 2),
-                    'unknown4':        data[40:42],
+                    'random_id':   data.uint( 3,11),
+                    'timeslot':  1+data.uint(11,13),
+                    'ul_sb':       data.uint(13,18), # uplink_subband
+                    'dl_sb':       data.uint(18,23), # downlink_subband
+                    'access':    1+data.uint(23,26),
+                    'dtoa':        data.uint(26,34),
+                    'dfoa':        data.uint(34,40),
+                    'unknown4':    data.bin (40,42),
                 }
                 if assignment['dtoa'] > 128:
                     assignment['dtoa']=assignment['dtoa']-256
-            elif data == '111000000000000000000000000000000000000000':
+            elif data == Bits(0b111<<39, 42):
                 assignment['empty']=True
             else:
                 assignment = {
                     **assignment,
-                    'unknown': data[3:42],
+                    'unknown':     data.bin ( 3,42),
                 }
             self.assignments.append(assignment)
 
+    def _fmt_iri_time(self):
+        if "iri_time" in self.__dict__:
+            (self.iri_time_ux, self.iri_time_str)= fmt_iritime(self.iri_time)
+    iri_time_ux=lazy(_fmt_iri_time)
+    iri_time_str=lazy(_fmt_iri_time)
+
+    def _fmt_tmsi_expiry(self):
+        if "tmsi_expiry" in self.__dict__:
+            (self.tmsi_expiry_ux, self.tmsi_expiry_str)= fmt_iritime(self.tmsi_expiry)
+    tmsi_expiry_ux=lazy(_fmt_tmsi_expiry)
+    tmsi_expiry_str=lazy(_fmt_tmsi_expiry)
+
     def upgrade(self):
         if self.error: return self
         try:
@@ -1516,7 +1865,7 @@ class IridiumBCMessage(IridiumECCMessage):
         tmp+= super()._pretty_trailer()
         return tmp
     def pretty(self):
-        str= "IBC: "+self._pretty_header()
+        str= self.frametype+": "+self._pretty_header()
         str+= " bc:%d" % self.bc_type
         if self.bc_type == 0:
             str+= ' sat:%03d cell:%02d %s slot:%d sv_blkn:%d aq_cl:%s aq_sb:%02d aq_ch:%d %s' % (self.sv_id, self.beam_id, self.unknown01, self.slot, self.sv_blocking, self.acqu_classes, self.acqu_subband, self.acqu_channels, self.unknown02)
@@ -1551,21 +1900,23 @@ class IridiumBCMessage(IridiumECCMessage):
         return str
 
 class IridiumRAMessage(IridiumECCMessage):
+    frametype="IRA"
     def __init__(self,imsg):
         self.__dict__=imsg.__dict__
         # Decode stuff from self.bitstream_bch
         # 3 blocks (63 bits) fixed "header".
-        if len(self.bitstream_bch)<63:
+        bits=self.bitstream_bch
+        if len(bits)<63:
             raise ParserError("RA content too short")
-        self.ra_sat=   int(self.bitstream_bch[0:7],2)   # sv_id
-        self.ra_cell=  int(self.bitstream_bch[7:13],2)  # beam_id
-        self.ra_pos_x= int(self.bitstream_bch[14:25],2) - int(self.bitstream_bch[13])*(1<<11)
-        self.ra_pos_y= int(self.bitstream_bch[26:37],2) - int(self.bitstream_bch[25])*(1<<11)
-        self.ra_pos_z= int(self.bitstream_bch[38:49],2) - int(self.bitstream_bch[37])*(1<<11)
-        self.ra_int=   int(self.bitstream_bch[49:56],2) # 90ms interval of RA (within same sat/cell)
-        self.ra_ts=    int(self.bitstream_bch[56:57],2) # Broadcast slot 1 or 4
-        self.ra_eip=   int(self.bitstream_bch[57:58],2) # EPI ?
-        self.ra_bc_sb= int(self.bitstream_bch[58:63],2) # BCH downlink sub-band
+        self.ra_sat=   bits.uint( 0, 7)  # sv_id
+        self.ra_cell=  bits.uint( 7,13)  # beam_id
+        self.ra_pos_x= bits.uint(14,25) - bits.uint(13,14)*(1<<11)
+        self.ra_pos_y= bits.uint(26,37) - bits.uint(25,26)*(1<<11)
+        self.ra_pos_z= bits.uint(38,49) - bits.uint(37,38)*(1<<11)
+        self.ra_int=   bits.uint(49,56) # 90ms interval of RA (within same sat/cell)
+        self.ra_ts=    bits.uint(56,57) # Broadcast slot 1 or 4
+        self.ra_eip=   bits.uint(57,58) # EPI ?
+        self.ra_bc_sb= bits.uint(58,63) # BCH downlink sub-band
 
         # this calculates geocentric latitude (=arcsin(z/r)) instead of geodetic latitude:
         self.ra_lat = atan2(self.ra_pos_z,sqrt(self.ra_pos_x**2+self.ra_pos_y**2))*180/pi
@@ -1574,7 +1925,7 @@ class IridiumRAMessage(IridiumECCMessage):
         self.ra_lon = atan2(self.ra_pos_y,self.ra_pos_x)*180/pi
         self.ra_alt = sqrt(self.ra_pos_x**2+self.ra_pos_y**2+self.ra_pos_z**2)*4
 
-        ra_msg=self.bitstream_bch[63:]
+        ra_msg=bits[63:]
 
         # Up to 12 PAGEs(@ 42 bits each) for max 432 symbol frame
         # PAGEs end with an all-1 page.
@@ -1592,13 +1943,13 @@ class IridiumRAMessage(IridiumECCMessage):
         if len(ra_msg)%42>0:
             self.page_cnt+=1
 
-        blocks, _ = slice_extra(ra_msg,42)
+        blocks, _ = ra_msg.split(42)
         for page in blocks:
             paging={
-                'tmsi':  int(page[ 0:32],2),
-                'zero1': int(page[32:34],2),
-                'msc_id':int(page[34:39],2),
-                'zero2': int(page[39:42],2),
+                'tmsi':  page.uint( 0,32),
+                'zero1': page.uint(32,34),
+                'msc_id':page.uint(34,39),
+                'zero2': page.uint(39,42),
             }
 
             paging['str'] = "tmsi:%08x"%paging['tmsi']
@@ -1608,13 +1959,13 @@ class IridiumRAMessage(IridiumECCMessage):
 
             self.paging.append(paging)
 
-            if page=="1"*42:
+            if page.val==(1<<42)-1:
                 paging['str']="END"
                 break
 
         if self.paging[-1]['str']=="END":
             if len(self.paging)<self.page_cnt: # Bits left at the end
-                self.ra_extra=ra_msg[42*(len(self.paging)):]
+                self.ra_extra=ra_msg.bin(42*(len(self.paging)))
                 if self.ra_extra.startswith("101000100111001110111"):
                     del(self.ra_extra)
                     self.trailer="{OK:UNCLEAN}"
@@ -1640,7 +1991,7 @@ class IridiumRAMessage(IridiumECCMessage):
         return self
 
     def pretty(self):
-        str= "IRA: "+self._pretty_header()
+        str= self.frametype+": "+self._pretty_header()
         str+= " sat:%03d"%self.ra_sat
         str+= " beam:%02d"%self.ra_cell
         str+= " xyz=(%+05d,%+05d,%+05d)"%(self.ra_pos_x,self.ra_pos_y,self.ra_pos_z)
@@ -1665,26 +2016,30 @@ class IridiumRAMessage(IridiumECCMessage):
         return str
 
 class IridiumMSMessage(IridiumECCMessage):
+    frametype="IMS"
     def __init__(self,imsg):
         # Ref: US5596315
         self.__dict__=imsg.__dict__
-        blocks= slice(self.bitstream_bch,21)
+        hdr=self.bitstream_bch[:21]
 
-        self.ms_type=    int(blocks[0][0],     2) # 1 if Acq group
-        self.zero1 =         blocks[0][ 1: 5]
-        self.block =     int(blocks[0][ 5: 9], 2) # Block number in the super frame
-        self.frame =     int(blocks[0][ 9:15], 2) # Current frame number (OR: Current cell number)
-        self.bch_blocks= int(blocks[0][15:19], 2) # Number of (42-bit) BCH blocks in this message
+        self.ms_type=    hdr.uint( 0, 1) # 1 if Acq group
+        self.zero1 =     hdr.bin ( 1, 5)
+        self.block =     hdr.uint( 5, 9) # Block number in the super frame
+        self.frame =     hdr.uint( 9,15) # Current frame number (OR: Current cell number)
+        self.bch_blocks= hdr.uint(15,19) # Number of (42-bit) BCH blocks in this message
 
         if self.ms_type==1:
             self.group="A"
             self.group_int=0
-            self.unknown1  = blocks[0][19]        # ?
-            self.secondary = int(blocks[0][20])   # Something like secondary SV
+            self.unknown1  = hdr.bin(19,20) # ?
+            self.secondary = hdr.uint(20,21) # Something like secondary SV
         else:
-            self.group=      int(blocks[0][19:21], 2)
+            self.group=      hdr.uint(19,21)
             self.group_int= 1+self.group
 
+        # the message body is handled bitwise as text
+        blocks= slice(str(self.bitstream_bch),21)
+
         if self.zero1 != '0000':
             self._new_error("zero1 not 0000")
 
@@ -1700,7 +2055,7 @@ class IridiumMSMessage(IridiumECCMessage):
 #            raise ParserError("")
         elif self.bch_blocks*2 < len(blocks):
             self.trailer="{EXTRA}"
-            self.bch_extra=self.bitstream_bch[self.bch_blocks*42:]
+            self.bch_extra=self.bitstream_bch.bin(self.bch_blocks*42)
             blocks=blocks[:2*self.bch_blocks]
 
         myodd="".join([x[:1] for x in blocks]) # collect "oddbits"
@@ -1766,11 +2121,12 @@ class IridiumMSMessage(IridiumECCMessage):
         return str
 
     def pretty(self):
-        str= "IMS: "+self._pretty_header()
+        str= self.frametype+": "+self._pretty_header()
         str+=self._pretty_trailer()
         return str
 
 class IridiumMSMessageBody(IridiumMSMessage):
+    frametype="MSG"
     def __init__(self, imsg):
         self.__dict__=imsg.__dict__
 
@@ -1823,7 +2179,7 @@ class IridiumMSMessageBody(IridiumMSMessage):
         return str
 
     def pretty(self):
-        str= "MSG: "+self._pretty_header()
+        str= self.frametype+": "+self._pretty_header()
         if "msg_data" in self.__dict__:
             str+= " "+group(self.msg_data,20)
         str+=self._pretty_trailer()
@@ -1849,6 +2205,7 @@ def msg_checksum(blocks):
 class IridiumMessagingAscii(IridiumMSMessageBody):
     def __init__(self,immsg):
         self.__dict__=immsg.__dict__
+        args=self.parser.args
 
         rest=self.msg_data
 
@@ -1918,12 +2275,13 @@ class IridiumMessagingAscii(IridiumMSMessageBody):
         msgx="".join(["%02x"%int(x,2) for x in full])
         return str+ " csum:%02x msg:%s.%s"%(self.msg_checksum,msgx,rest)
     def pretty(self):
-        str= "MSG: "+self._pretty_header()
+        str= self.frametype+": "+self._pretty_header()
         str+= " TXT: %-65s"%self.msg_ascii+" +%-6s"%self.msg_rest
         str+= self._pretty_trailer()
         return str
 
 class IridiumMessagingBCD(IridiumMSMessageBody):
+    frametype="MS3"
     def __init__(self,immsg):
         self.__dict__=immsg.__dict__
 
@@ -1941,13 +2299,14 @@ class IridiumMessagingBCD(IridiumMSMessageBody):
         str+= " %6s"%(self.pkt_cs1)
         return str+ " %s"%(self.msg_unknown2)
     def pretty(self):
-        str= "MS3: "+self._pretty_header()
+        str= self.frametype+": "+self._pretty_header()
         str+= " BCD: %-65s"%self.bcd
         str+= self._pretty_trailer()
         return str
 
 
 class IridiumNXTMessage(IridiumMessage):
+    frametype="NXT"
     def __init__(self, imsg):
         self.__dict__ = imsg.__dict__
         self.fixederrs = 0
@@ -1965,7 +2324,7 @@ class IridiumNXTMessage(IridiumMessage):
         return self
 
     def pretty(self):
-        st = "NXT: " + self._pretty_header()
+        st = self.frametype+": "+self._pretty_header()
         st += " " + group(self.descrambled[:32], 8)
         st += " | "
         st += group(self.descrambled[32:36], 2)
@@ -1976,31 +2335,55 @@ class IridiumNXTMessage(IridiumMessage):
 
 def symbol_reverse(bits):
     r = bytearray(bits.encode("us-ascii"))
-    for x in range(0,len(r)-1,2):
-        i=r[x+0]
-        r[x+0]=r[x+1]
-        r[x+1]=i
+    e = len(r)&~1
+    r[0:e:2], r[1:e:2] = r[1:e:2], r[0:e:2]
     return r.decode("us-ascii")
 
+# de-interleaving is a fixed permutation per input length: precompute the
+# bit positions of every output once and apply them with a single gather
+def _gather(idx):
+    if not idx:
+        return lambda bits: ""
+    if len(idx)==1:
+        return lambda bits: bits[idx[0]]
+    return operator.itemgetter(*idx)
+
+_interleave_tbl={}
+def _interleave_idx(n, parts):
+    if (n, parts) not in _interleave_tbl:
+        symbols=(n+1)//2 # odd lengths raise IndexError like the symbol based version
+        idx=[[2*z+o for z in range(symbols-1-p, -1, -parts) for o in (1,0)] for p in range(parts)]
+        _interleave_tbl[(n, parts)]=(idx, [_gather(x) for x in idx])
+    return _interleave_tbl[(n, parts)]
+
 def de_interleave(group):
-    symbols = [group[z+1]+group[z] for z in range(0,len(group),2)]
-    even = ''.join([symbols[x] for x in range(len(symbols)-2,-1, -2)])
-    odd  = ''.join([symbols[x] for x in range(len(symbols)-1,-1, -2)])
-    return (odd,even)
+    (_, (odd, even))=_interleave_idx(len(group), 2)
+    return (''.join(odd(group)), ''.join(even(group)))
 
 def de_interleave3(group):
-    symbols = [group[z+1]+group[z] for z in range(0,len(group),2)]
-    third  = ''.join([symbols[x] for x in range(len(symbols)-3, -1, -3)])
-    second = ''.join([symbols[x] for x in range(len(symbols)-2, -1, -3)])
-    first  = ''.join([symbols[x] for x in range(len(symbols)-1, -1, -3)])
-    return (first,second,third)
+    (_, (first, second, third))=_interleave_idx(len(group), 3)
+    return (''.join(first(group)), ''.join(second(group)), ''.join(third(group)))
 
-def de_interleave_lcw(bits):
-    tbl= [ 40, 39, 36, 35, 32, 31, 28, 27, 24, 23, 20, 19, 16, 15, 12, 11,  8,  7,  4,  3,
+lcw_tbl= [ 40, 39, 36, 35, 32, 31, 28, 27, 24, 23, 20, 19, 16, 15, 12, 11,  8,  7,  4,  3,
            41, 38, 37, 34, 33, 30, 29, 26, 25, 22, 21, 18, 17, 14, 13, 10,  9,  6,  5,  2,
             1, 46, 45, 44, 43, 42]
-    lcw=[bits[x-1:x] for x in tbl]
-    return (''.join(lcw[:7]),''.join(lcw[7:20]),''.join(lcw[20:]))
+lcw_idx= [[x-1 for x in lcw_tbl[:7]], [x-1 for x in lcw_tbl[7:20]], [x-1 for x in lcw_tbl[20:]]]
+lcw_gather= [_gather(x) for x in lcw_idx]
+
+def de_interleave_lcw(bits):
+    if len(bits)<len(lcw_tbl):
+        lcw=[bits[x-1:x] for x in lcw_tbl]
+        return (''.join(lcw[:7]),''.join(lcw[7:20]),''.join(lcw[20:]))
+    return tuple(''.join(g(bits)) for g in lcw_gather)
+
+def de_interleave_array(frames, parts=2):
+    """Batch de_interleave()/de_interleave3() for a 2d NumPy array with one frame (group) per row"""
+    (idx, _)=_interleave_idx(frames.shape[1], parts)
+    return [frames[:, x] for x in idx]
+
+def de_interleave_lcw_array(frames):
+    """Batch de_interleave_lcw() for a 2d NumPy array with one frame per row"""
+    return [frames[:, x] for x in lcw_idx]
 
 def messagechecksum(msg):
     csum=0
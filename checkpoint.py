@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim: set ts=4 sw=4 tw=0 et pm=:
+
+"""
+Checkpoints to resume interrupted iridium-parser.py runs
+
+A checkpoint is a small json file with the position in the input (number
+of the input file, byte offset and line count) and whatever state the
+caller needs to continue (output size, timestamp tracking, error stats).
+
+Checkpoints are only taken between two blocks of input, when all lines
+before have been processed. Uncompressed files are resumed at the byte
+offset, other inputs skip the lines already read.
+"""
+
+import os
+import json
+import time
+import collections
+from itertools import islice
+
+class Stopped(Exception):
+    """Raised after a checkpoint was taken because of a signal"""
+
+class Checkpoint(object):
+    def __init__(self, path, statefn, inputs, interval=60):
+        self.path=path
+        self.statefn=statefn # returns the caller's state as dict
+        self.inputs=[[name, os.stat(name).st_size] for name in inputs]
+        self.interval=interval
+        self.due=time.monotonic()+interval
+        self.stopping=False
+        self.state=None # checkpoint to resume from
+        self.file=0
+        self.lineno=0
+        self.fileline=0
+
+    def load(self):
+        """Read the checkpoint, returns its state or None if there is none"""
+        try:
+            with open(self.path) as f:
+                state=json.load(f)
+        except FileNotFoundError:
+            return None
+        if state.get('inputs')!=self.inputs:
+            raise ValueError("%s: input files differ from the checkpointed run"%self.path)
+        self.state=state
+        return state
+
+    def resume(self, fileidx):
+        """State to resume the fileidx-th input with, None to start it from the beginning"""
+        if self.state is not None and self.state['file']==fileidx:
+            return self.state
+        return None
+
+    def save(self, offset):
+        state=self.statefn()
+        state.update(inputs=self.inputs, file=self.file, offset=offset,
+                     fileline=self.fileline, lineno=self.lineno)
+        tmp="%s.%d.tmp"%(self.path, os.getpid())
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self.due=time.monotonic()+self.interval
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def stop(self, signum=None, frame=None):
+        """Signal handler: take a checkpoint at the next block and raise Stopped"""
+        self.stopping=True
+
+    def block(self, offset, lines):
+        """Called before each block of lines is processed (offset None if
+        the input can't be seeked), lines is None at the end of the input"""
+        if lines is None:
+            return
+        if self.stopping or time.monotonic()>=self.due:
+            self.save(offset)
+            if self.stopping:
+                raise Stopped()
+        self.lineno+=len(lines)
+        self.fileline+=len(lines)
+
+    def track(self, infile, fileidx, lineno):
+        """Lines of infile, the fileidx-th input, opened at the checkpointed
+        offset if resumed. Checkpoints are taken between blocks."""
+        self.file=fileidx
+        self.lineno=lineno
+        self.fileline=0
+        skip=0
+        resume=self.resume(fileidx)
+        if resume is not None:
+            self.fileline=resume['fileline']
+            if resume['offset'] is None:
+                skip=self.fileline
+            self.state=None
+        if hasattr(infile, 'blockhook'): # readahead.MappedLines
+            prev=infile.blockhook
+            def hook(offset, lines):
+                if prev is not None:
+                    prev(offset, lines)
+                self.block(offset, lines)
+            infile.blockhook=hook
+            return infile
+        return self.blocks(infile, skip)
+
+    def blocks(self, infile, skip, size=10000):
+        collections.deque(islice(infile, skip), maxlen=0)
+        while True:
+            lines=list(islice(infile, size))
+            if not lines:
+                return
+            self.block(None, lines)
+            yield from lines
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim: set ts=4 sw=4 tw=0 et pm=:
+
+"""
+Merge the RAW lines of several receivers into one stream ordered by time
+
+Each input is expected to be (mostly) in time order, as iridium-extractor
+writes it. Frames received by more than one receiver are only passed on
+once, the copy with the best confidence is kept.
+"""
+
+import heapq
+from operator import itemgetter
+
+import bitsparser
+
+def timed(lines):
+    """(globalns, line) for each line, lines without known time get the
+    time of the line before"""
+    ns=0
+    for line in lines:
+        t=bitsparser.raw_globalns(line)
+        if t is not None:
+            ns=t
+        yield (ns, line)
+
+def merge(inputs):
+    """(globalns, line) of all inputs, merged by time"""
+    return heapq.merge(*map(timed, inputs), key=itemgetter(0))
+
+class Dedup(object):
+    """Drop frames seen by more than one receiver.
+
+    Frames are duplicates if they are within window ns and fwindow Hz and
+    the bits of one start with the bits of the other (receivers don't cut
+    bursts at the same length). The default window is below the 8.28ms
+    TDMA slot length, so bursts of different slots are never merged.
+    Frames with less than min_bits bits are too short to tell by a common
+    prefix, they are only duplicates if their bits are the same. Lines
+    which can't be parsed are only duplicates of identical lines.
+    """
+    def __init__(self, window=5*10**6, fwindow=20000, min_bits=64):
+        self.window=window
+        self.fwindow=fwindow
+        self.min_bits=min_bits
+        self.pending=[] # [globalns, frequency, confidence, bits, line], bits=line if unparsed
+        self.dropped=0
+
+    def frames(self, timed):
+        """Lines of (globalns, line) pairs, without duplicates"""
+        pending=self.pending
+        for (ns, line) in timed:
+            cutoff=ns-self.window
+            if pending and pending[0][0]<cutoff:
+                yield from self.flush(cutoff)
+            g=bitsparser.raw_groups(line)
+            if g is None:
+                (frequency, confidence, bits)=(None, None, line)
+            else:
+                (frequency, confidence, bits)=(int(g[3]), int(g[8]), g[11])
+            prefix=frequency is not None and len(bits)>=self.min_bits
+            for entry in pending:
+                other=entry[3]
+                if (entry[1] is None) != (frequency is None) or abs(entry[0]-ns)>self.window:
+                    continue
+                if frequency is not None and abs(entry[1]-frequency)>self.fwindow:
+                    continue
+                if bits == other or (prefix and len(other)>=self.min_bits and
+                                     (bits.startswith(other) or other.startswith(bits))):
+                    self.dropped+=1
+                    if frequency is not None and (confidence, len(bits))>(entry[2], len(other)):
+                        entry[:]=[ns, frequency, confidence, bits, line]
+                    break
+            else:
+                pending.append([ns, frequency, confidence, bits, line])
+        yield from self.flush(None)
+
+    def flush(self, cutoff):
+        """Pass on all pending lines before cutoff (all if None)"""
+        if cutoff is None:
+            ready=self.pending[:]
+            del self.pending[:]
+        else:
+            ready=[entry for entry in self.pending if entry[0]<cutoff]
+            self.pending[:]=[entry for entry in self.pending if entry[0]>=cutoff]
+        ready.sort(key=itemgetter(0))
+        for entry in ready:
+            yield entry[4]
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim: set ts=4 sw=4 tw=0 et pm=:
+
+"""
+Binary records of parsed frames
+
+    iridium-parser.py -o frames in.bits > out.frames
+    reassembler.py -m ida -i out.frames
+
+Besides the text line of a frame, each record holds its header fields and
+(for IRA, IBC and IDA frames) the decoded fields reassembler modes need,
+so they don't have to be parsed out of the text again. Numbers are rounded
+as in the text, so both give the same results.
+
+File layout (little endian): the magic, then one record per frame:
+
+  4s type ("IRA:", ...), H length of the rest of the record,
+  q nstime (ns since recording start), I frequency, B confidence,
+  B flags (1: uplink, 2: snr/noise), H symbols, d level (dB with snr),
+  d noise, d snr,
+  B name length, H line length, H data offset (in the line, after the
+  header fields), name, text line, type specific fields
+
+  IRA: B sat, B beam, 3h xyz, d lat, d lon, h alt, B pages, pages: I tmsi, B msc_id
+  IBC: B sat (255: none), B beam, B unknown01, B slot, q iri_time (-1: none)
+  IDA: B cont, B flag, B ctr, B length, B zero1, B crc ok, B payload length, payload
+
+zmq messages (-o zmq --zmq-frames) are records without the magic, several
+concatenated with --zmq-join. As records start with the frame type,
+subscriptions work as with text.
+"""
+
+import os
+import sys
+import struct
+import math
+
+from readahead import open_file, compressed
+
+MAGIC=b"IRFRAME\x01"
+
+rec_hdr=struct.Struct("<4sH")
+frame_hdr=struct.Struct("<qIBBHdddBHH")
+ira_hdr=struct.Struct("<BB3hddhB")
+page_hdr=struct.Struct("<IB")
+ibc_hdr=struct.Struct("<BBBBq")
+ida_hdr=struct.Struct("<BBBBBBB")
+
+F_UPLINK=1
+F_SNR=2
+
+NO_SAT=255
+
+def is_frames(filename):
+    base, ext = os.path.splitext(filename)
+    if ext in compressed:
+        ext = os.path.splitext(base)[1]
+    return ext == '.frames'
+
+def pack_ira(q):
+    pages=[p for p in q.paging if p['zero1']==0 and p['zero2']==0]
+    rec=ira_hdr.pack(q.ra_sat, q.ra_cell, q.ra_pos_x, q.ra_pos_y, q.ra_pos_z,
+                     round(q.ra_lat, 2), round(q.ra_lon, 2), int(q.ra_alt-6378+23), len(pages))
+    for p in pages:
+        rec+=page_hdr.pack(p['tmsi'], p['msc_id'])
+    return rec
+
+def pack_ibc(q):
+    if "sv_id" not in q.__dict__:
+        return ibc_hdr.pack(NO_SAT, 0, 0, 0, -1)
+    return ibc_hdr.pack(q.sv_id, q.beam_id, int(q.unknown01), q.slot, q.__dict__.get("iri_time", -1))
+
+def pack_ida(q):
+    bits=q.bitstream_bch
+    if q.da_len>0 and all(x==0 for x in q.da_ta[q.da_len+1:]):
+        payload=bytes(q.da_ta[:q.da_len])
+    else:
+        payload=bytes(q.da_ta)
+    return ida_hdr.pack(bits.uint(3,4), bits.uint(4,5), q.da_ctr, q.da_len, q.zero1, q.da_len>0 and q.crc_ok, len(payload))+payload
+
+typed={b"IRA:": pack_ira, b"IBC:": pack_ibc, b"IDA:": pack_ida}
+
+def message_header(q, frame):
+    """Set the fields of unpack_header() on frame from message q (with
+    uplink/downlink info), as they would be read from its record"""
+    frame.typ=q.frametype+":"
+    frame.name=q._pretty_name()
+    # same rounding as the text timestamp
+    frame.nstime=int(("%.4f"%q.timestamp).replace(".", ""))*100
+    frame.frequency=q.frequency
+    frame.confidence=q.confidence
+    frame.uplink=bool(q.uplink)
+    frame.symbols=q.symbols-12
+    if "snr" in q.__dict__:
+        (frame.level, frame.noise, frame.snr)=(round(q.leveldb, 2), round(q.noise, 2), round(q.snr, 2))
+    else:
+        (frame.level, frame.noise, frame.snr)=(round(q.level, 3), None, None)
+    return frame
+
+def pack(q, line):
+    """Record of message q (with uplink/downlink info), line is its pretty() output"""
+    f=message_header(q, Frame())
+    typ=f.typ.encode('ascii')
+    name=f.name.encode('utf-8', 'surrogateescape')
+    flags=0
+    if f.uplink:
+        flags|=F_UPLINK
+    if f.snr is not None:
+        flags|=F_SNR
+        (noise, snr)=(f.noise, f.snr)
+    else:
+        (noise, snr)=(math.nan, math.nan)
+    text=line.encode('utf-8', 'surrogateescape')
+    dataoff=len(text)-len(line.split(None, 8)[8].encode('utf-8', 'surrogateescape'))
+    rec=frame_hdr.pack(f.nstime, f.frequency, f.confidence, flags, f.symbols,
+                       f.level, noise, snr, len(name), len(text), dataoff)+name+text
+    if typ in typed:
+        rec+=typed[typ](q)
+    return rec_hdr.pack(typ, len(rec))+rec
+
+class Frame(object):
+    """Fields of a record, see unpack()"""
+    pass
+
+# fields set by unpack_fields()
+fields={"sat", "beam", "xyz", "lat", "lon", "alt", "pages", "unknown01", "slot", "iri_time",
+        "cont", "flag", "ctr", "length", "zero1", "crc_ok", "payload"}
+
+def unpack_header(rec, frame):
+    """Set typ, name, nstime, frequency, confidence, uplink, symbols, level,
+    noise and snr (None if not in the record) of frame.
+
+    Returns the offsets of the line, its data (the text after the header
+    fields) and its end, which is where the type specific fields start.
+    """
+    (frame.nstime, frame.frequency, frame.confidence, flags, frame.symbols, frame.level, noise, snr, namelen, linelen, dataoff)=frame_hdr.unpack_from(rec, rec_hdr.size)
+    pos=rec_hdr.size+frame_hdr.size
+    frame.typ=rec[:4].decode('ascii')
+    frame.uplink=bool(flags & F_UPLINK)
+    if flags & F_SNR:
+        (frame.noise, frame.snr)=(noise, snr)
+    else:
+        frame.noise=frame.snr=None
+    frame.name=rec[pos:pos+namelen].decode('utf-8', 'surrogateescape')
+    pos+=namelen
+    return (pos, pos+dataoff, pos+linelen)
+
+def unpack_fields(rec, pos, frame, typ=None):
+    """Set the type specific fields of frame, starting at pos:
+    sat, beam, xyz, lat, lon, alt, pages [(tmsi, msc_id)] (IRA),
+    sat (None if not in the frame), beam, unknown01, slot, iri_time (IBC),
+    cont, flag, ctr, length, zero1, crc_ok, payload (IDA).
+
+    typ is the type of the record, needed if rec only holds the fields."""
+    if typ is None:
+        typ=rec[:4]
+    if typ==b"IRA:":
+        (frame.sat, frame.beam, x, y, z, frame.lat, frame.lon, frame.alt, npages)=ira_hdr.unpack_from(rec, pos)
+        frame.xyz=(x, y, z)
+        pos+=ira_hdr.size
+        frame.pages=[page_hdr.unpack_from(rec, pos+i*page_hdr.size) for i in range(npages)]
+    elif typ==b"IBC:":
+        (frame.sat, frame.beam, frame.unknown01, frame.slot, frame.iri_time)=ibc_hdr.unpack_from(rec, pos)
+        if frame.sat==NO_SAT:
+            frame.sat=None
+        if frame.iri_time<0:
+            frame.iri_time=None
+    elif typ==b"IDA:":
+        (frame.cont, frame.flag, frame.ctr, frame.length, frame.zero1, crc_ok, size)=ida_hdr.unpack_from(rec, pos)
+        frame.crc_ok=bool(crc_ok)
+        pos+=ida_hdr.size
+        frame.payload=rec[pos:pos+size]
+
+def unpack(rec, frame=None):
+    """Set all fields of a record (without magic) as attributes of frame
+    (a new Frame by default) and return it: the text line as line and
+    the fields set by unpack_header() and unpack_fields()"""
+    if frame is None:
+        frame=Frame()
+    (start, _, end)=unpack_header(rec, frame)
+    frame.line=rec[start:end].decode('utf-8', 'surrogateescape')
+    unpack_fields(rec, end, frame)
+    return frame
+
+def globalns(rec):
+    """globalns of a record, None if unknown (see timeindex.parsed_globalns)"""
+    hdr=frame_hdr.unpack_from(rec, rec_hdr.size)
+    pos=rec_hdr.size+frame_hdr.size
+    name=rec[pos:pos+hdr[8]]
+    if not name.startswith(b"p-"):
+        return None
+    try:
+        return int(name[2:].partition(b"-")[0])*10**9+hdr[0]
+    except ValueError:
+        return None
+
+def split(buf, pos=0):
+    """Records in buf (a zmq message, --zmq-join concatenates them), starting
+    at pos. Stops at an incomplete record, its offset is returned."""
+    end=len(buf)
+    hdrsize=rec_hdr.size
+    while pos+hdrsize<=end:
+        (_, size)=rec_hdr.unpack_from(buf, pos)
+        nxt=pos+hdrsize+size
+        if nxt>end:
+            break
+        yield buf[pos:nxt]
+        pos=nxt
+    return pos
+
+class Reader(object):
+    """Iterate over the records of a frames file (as bytes, for unpack())"""
+    def __init__(self, filename):
+        if filename == '-':
+            self.file=sys.stdin.buffer
+        else:
+            self.file=open_file(filename, 'rb')
+        if self.file.read(len(MAGIC))!=MAGIC:
+            raise ValueError("%s: not a frames file"%filename)
+        self.records=self.read_records()
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self):
+        return self.records
+
+    def read_records(self, blocksize=1<<20):
+        read=self.file.read
+        buf=b""
+        while True:
+            block=read(blocksize)
+            if not block:
+                return
+            buf+=block
+            pos=yield from split(buf)
+            buf=buf[pos:]
+
+if __name__ == "__main__":
+    # print the text lines of a frames file
+    for rec in Reader(sys.argv[1] if len(sys.argv)>1 else '-'):
+        print(unpack(rec).line)
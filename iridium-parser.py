@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 # vim: set ts=4 sw=4 tw=0 et pm=:
 
+import io
 import os
 import sys
 import re
@@ -9,21 +10,59 @@ import fileinput
 import datetime
 import time
 import argparse
+import operator
+import ast
+import collections
 import collections.abc
+import stat
 
 import bitsparser
+import bitspack
+import readahead
+import timeindex
+import checkpoint
+import framemerge
 
 parser = argparse.ArgumentParser(formatter_class=lambda prog: argparse.HelpFormatter(prog, max_help_position=27))
 
 def parse_comma(arg):
     return arg.split(',')
 
+compare_ops = {'==': operator.eq, '!=': operator.ne, '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+
+def compile_check(check):
+    # simple "q.attr <op> literal" checks don't need eval
+    m = re.match(r'\s*q\.(\w+)\s*(==|!=|<=|>=|<|>)\s*(.+?)\s*$', check)
+    if m:
+        (attr, op, value) = m.groups()
+        try:
+            value = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            pass
+        else:
+            op = compare_ops[op]
+            return lambda q: op(getattr(q, attr), value)
+    try:
+        code = compile(check, '<filter>', 'eval')
+    except SyntaxError as e:
+        raise argparse.ArgumentTypeError("invalid check '%s': %s" % (check, e.msg))
+    return lambda q: eval(code, globals(), {'q': q})
+
 def parse_filter(arg):
     linefilter = {'type': arg, 'attr': None, 'check': None}
     if ',' in linefilter['type']:
         (linefilter['type'], linefilter['check']) = linefilter['type'].split(',', 2)
     if '+' in linefilter['type']:
         (linefilter['type'], linefilter['attr']) = linefilter['type'].split('+')
+    # resolve class & compile check only once
+    linefilter['class'] = None
+    if linefilter['type'] != 'All':
+        linefilter['class'] = getattr(bitsparser, linefilter['type'], None)
+        if not isinstance(linefilter['class'], type):
+            raise argparse.ArgumentTypeError("unknown message class '%s'" % linefilter['type'])
+    linefilter['check_fn'] = None
+    if linefilter['check']:
+        linefilter['check_fn'] = compile_check(linefilter['check'])
     return linefilter
 
 
@@ -44,6 +83,10 @@ filters.add_argument("-e", "--errorfree", action="store_true",
                      help="drop lines that could not be parsed")
 filters.add_argument("--filter", type=parse_filter, default='All', dest='linefilter', metavar='FILTER',
                      help="filter output by class and/or attribute")
+filters.add_argument("--start", type=timeindex.parse_time, metavar='TIME',
+                     help="drop frames before TIME (unix time or ISO 8601)")
+filters.add_argument("--end", type=timeindex.parse_time, metavar='TIME',
+                     help="drop frames at or after TIME (unix time or ISO 8601)")
 
 parser.add_argument("-v", "--verbose",     action="store_true",
                     help="increase output verbosity")
@@ -57,7 +100,7 @@ parser.add_argument("-s", "--satclass",    action="store_true", dest='dosatclass
                     help="enable sat classification")
 parser.add_argument("--plot", type=parse_comma, dest='plotargs', default='time,frequency', metavar='ARGS'
                     )
-parser.add_argument("-o", "--output", metavar='MODE', choices=['json', 'sigmf', 'zmq', 'line', 'plot', 'err', 'sat', 'file'],
+parser.add_argument("-o", "--output", metavar='MODE', choices=['json', 'sigmf', 'zmq', 'line', 'plot', 'err', 'sat', 'file', 'frames'],
                     help="output mode")
 parser.add_argument("--errorfile", metavar='FILE',
                     help="divert unparsable lines to separate file")
@@ -73,6 +116,40 @@ parser.add_argument("--sigmf-annotate", dest='sigmffile'
                     )
 parser.add_argument("--stats", "--no-stats", action=NegateAction, dest="do_stats", nargs=0,
                     help='enable incremental statistics on stderr')
+parser.add_argument("-j", "--jobs", type=int, default=1, metavar='N',
+                    help="parse with N worker processes (0: one per cpu)")
+parser.add_argument("--chunksize", type=int, default=2000, metavar='LINES',
+                    help="lines per worker task with --jobs")
+parser.add_argument("--index", "--no-index", action=NegateAction, dest="use_index", nargs=0, default=None,
+                    help="use/build a time index (FILE.idx) for uncompressed input files (default: with --start/--end)")
+parser.add_argument("--start-offset", type=int, default=0, metavar='BYTES',
+                    help="start parsing at the first line beginning at or after this byte offset")
+parser.add_argument("--stop-offset", type=int, default=None, metavar='BYTES',
+                    help="stop parsing with the last line beginning before this byte offset")
+parser.add_argument("--merge", action="store_true",
+                    help="merge input files from several receivers by time, dropping duplicate frames")
+parser.add_argument("--merge-window", type=float, default=5, metavar='MS',
+                    help="max. time difference of duplicate frames with --merge (default: %(default)s)")
+parser.add_argument("--checkpoint", metavar='FILE',
+                    help="save progress to FILE periodically and resume from it")
+parser.add_argument("--checkpoint-interval", type=float, default=60, metavar='SECONDS',
+                    help="time between checkpoints (default: %(default)s)")
+
+zmqopts = parser.add_argument_group('zmq output')
+
+zmqopts.add_argument("--zmq-bind", default="tcp://127.0.0.1:4223", metavar='ADDR',
+                     help="address to publish on (default: %(default)s)")
+zmqopts.add_argument("--zmq-batch", type=int, default=1, metavar='N',
+                     help="send up to N frames of the same type per message")
+zmqopts.add_argument("--zmq-join", action="store_true",
+                     help="join batched frames with newlines instead of sending them as multipart message")
+zmqopts.add_argument("--zmq-hwm", type=int, default=1000, metavar='N',
+                     help="queue up to N messages per subscriber, drop messages while one is full (default: %(default)s)")
+zmqopts.add_argument("--zmq-frames", action="store_true",
+                     help="publish binary records (as -o frames) instead of text lines")
+zmqopts.add_argument("--zmq-backlog", type=int, default=0, metavar='N',
+                     help="keep up to N messages a subscriber can't take instead of dropping them (all subscribers wait for the slowest one)")
+
 parser.add_argument("remainder", nargs='*',
                     help=argparse.SUPPRESS)
 
@@ -82,8 +159,13 @@ args = parser.parse_args()
 if args.perfect and (args.harder or args.uwec):
     print("WARN: --perfect contradicts --harder or --uw-ec", file=sys.stderr)
 
-# push options into bitsparser
-bitsparser.set_opts(args)
+if (args.start_offset or args.stop_offset is not None) and len(args.remainder)!=1:
+    parser.error("--start-offset/--stop-offset need exactly one input file")
+
+timebounds = args.start is not None or args.end is not None
+
+# json output dumps the whole __dict__
+rawparser=bitsparser.Parser(args, eager_fields=(args.output == "json"))
 
 # forced settings
 if args.sigmffile:
@@ -114,9 +196,31 @@ if args.output == "json":
 if args.output == "sigmf":
     import json
 
-if args.output == "zmq":
+if args.output == "zmq" or args.output == "frames":
     args.errorfree=True
 
+if args.output == "frames" or args.zmq_frames:
+    import framepack
+
+if args.jobs == 0:
+    args.jobs=os.cpu_count()
+
+if args.merge:
+    if args.jobs > 1 or args.checkpoint:
+        parser.error("--merge can't be used with --jobs or --checkpoint")
+    if args.start_offset or args.stop_offset is not None:
+        parser.error("--merge can't be used with --start-offset/--stop-offset")
+
+if args.checkpoint:
+    if not args.remainder or '-' in args.remainder:
+        parser.error("--checkpoint needs named input files")
+    if args.jobs > 1:
+        parser.error("--checkpoint can't be used with --jobs")
+    if args.output not in ('line', 'file', 'json', 'zmq'):
+        parser.error("--checkpoint does not support output mode '%s'" % args.output)
+    if args.output in ('line', 'json') and not stat.S_ISREG(os.fstat(sys.stdout.fileno()).st_mode):
+        parser.error("--checkpoint needs the output redirected to a file")
+
 if args.do_stats:
     import curses
     statsfile=sys.stderr
@@ -169,8 +273,62 @@ if args.dosatclass is True:
 if (args.linefilter['type'] != 'All') and args.harder:
     raise Exception("--harder and --filter (except type=Any) can't be use at the same time")
 
+def checkpoint_state():
+    state={'tsoffset': rawparser.tsoffset, 'maxts': rawparser.maxts, 'tswarning': rawparser.tswarning}
+    if args.output != 'zmq':
+        state['output']=sync_output(sys.stdout)
+    if args.errorfile is not None:
+        state['errorfile']=sync_output(args.errorfile)
+    if isinstance(args.errorstats, collections.abc.Mapping):
+        state['errorstats']=args.errorstats
+    return state
+
+def sync_output(f):
+    """Flush f to disk, returns its size"""
+    f.flush()
+    os.fsync(f.fileno())
+    return os.fstat(f.fileno()).st_size
+
+def truncate_output(f, size):
+    """Drop output written after the checkpoint"""
+    if os.fstat(f.fileno()).st_size < size:
+        print("ERR: %s is shorter than at the checkpoint (truncated by '>'?)" % f.name, file=sys.stderr)
+        exit(1)
+    f.seek(size)
+    f.truncate()
+
+resume=None
+if args.checkpoint:
+    ckpt=checkpoint.Checkpoint(args.checkpoint, checkpoint_state, args.remainder, args.checkpoint_interval)
+    try:
+        resume=ckpt.load()
+    except ValueError as e:
+        parser.error(str(e))
+    if resume is not None:
+        (rawparser.tsoffset, rawparser.maxts, rawparser.tswarning)=(resume['tsoffset'], resume['maxts'], resume['tswarning'])
+        if isinstance(args.errorstats, collections.abc.Mapping):
+            args.errorstats.update(resume.get('errorstats', {}))
+        if args.output in ('line', 'json'):
+            truncate_output(sys.stdout, resume['output'])
+        print("Resuming at line %d of %s" % (resume['fileline'], args.remainder[resume['file']]), file=sys.stderr)
+    # preempted jobs get a SIGTERM: checkpoint before exiting
+    import signal
+    signal.signal(signal.SIGTERM, ckpt.stop)
+else:
+    ckpt=None
+
 if args.errorfile is not None:
-    args.errorfile=open(args.errorfile,"w")
+    if resume is not None and 'errorfile' in resume:
+        args.errorfile=open(args.errorfile,"r+")
+        truncate_output(args.errorfile, resume['errorfile'])
+    else:
+        args.errorfile=open(args.errorfile,"w")
+
+# skip lines which can't match the --filter class early, unless errors are
+# counted or written out
+prefilter=None
+if args.linefilter['class'] and args.errorfile is None and not isinstance(args.errorstats, collections.abc.Mapping):
+    prefilter=rawparser.make_prefilter(args.linefilter['class'])
 
 if args.output == "plot":
     import matplotlib.pyplot as plt
@@ -179,35 +337,43 @@ if args.output == "plot":
     yl=[]
     cl=[]
     sl=[]
+    plotfields=args.plotargs[:3]
+    if plotfields[0]=="time":
+        plotfields[0]="globalns"
 
 poller = None
 
 if args.output == "zmq":
     import zmq
-
-    url = "tcp://127.0.0.1:4223"
+    from threading import Thread, Event, Lock
 
     context = zmq.Context()
     socket = context.socket(zmq.XPUB)
+    socket.setsockopt(zmq.SNDHWM, args.zmq_hwm)
+    # don't drop silently when a subscriber is full, so drops can be counted
+    # (or the message kept in the backlog). The message then isn't sent to
+    # any subscriber, all of them are held up by the slowest one.
+    socket.setsockopt(zmq.XPUB_NODROP, True)
     if args.do_stats:
         socket.setsockopt(zmq.XPUB_VERBOSE, True)
         stats['clients']=0
         poller = zmq.Poller()
         poller.register(socket, zmq.POLLIN)
-    socket.bind(url)
+    socket.bind(args.zmq_bind)
 
 
     def zmq_xpub(poller, stats):
         try:
-            while len(rv:=poller.poll(0))>0:
-                event = rv[0][0].recv()
-                 # Event is one byte 0=unsub or 1=sub, followed by topic
-                if event[0] == 1:
-                    log("new subscriber for", event[1:])
-                    stats['clients'] += 1
-                elif event[0] == 0:
-                    log("unsubscribed",event[1:])
-                    stats['clients'] -= 1
+            with publisher.lock:
+                while len(rv:=poller.poll(0))>0:
+                    event = rv[0][0].recv()
+                     # Event is one byte 0=unsub or 1=sub, followed by topic
+                    if event[0] == 1:
+                        log("new subscriber for", event[1:])
+                        stats['clients'] += 1
+                    elif event[0] == 0:
+                        log("unsubscribed",event[1:])
+                        stats['clients'] -= 1
         except zmq.error.ContextTerminated:
             pass
 
@@ -215,6 +381,118 @@ if args.output == "zmq":
         s=time.strftime("%Y-%m-%d %H:%M:%S",time.localtime())
         print("%s:"%s,*msg, end=eolnl, file=statsfile)
 
+    class Publisher(object):
+        """Sends frames in batches of up to --zmq-batch frames of the same
+        type. Batches are multipart messages (subscriptions match the first
+        part, all parts are delivered) or joined with newlines.
+
+        A background thread sends batches older than maxage, also while no
+        input is coming in. The socket is only used with the lock held.
+
+        Messages subscribers can't take are dropped and counted. With
+        --zmq-backlog they are kept and retried, the oldest are dropped if
+        the backlog is full.
+        """
+        maxage=0.1 # seconds a frame waits for more of its type
+
+        def __init__(self, socket):
+            self.socket=socket
+            self.batches={}
+            self.started=None
+            self.backlog=collections.deque()
+            self.dropped=0
+            self.flags=zmq.NOBLOCK
+            self.lock=Lock()
+            self.stop=Event()
+            self.thread=None
+            if args.zmq_batch > 1 or args.zmq_backlog:
+                self.thread=Thread(target=self.flusher, daemon=True, name='zmq flush')
+                self.thread.start()
+
+        def emit(self, msg):
+            with self.lock:
+                if args.zmq_batch <= 1:
+                    self.send([msg])
+                    return
+                topic=msg[:4] # "IRA:", text lines and binary records alike
+                batch=self.batches.setdefault(topic, [])
+                batch.append(msg)
+                if self.started is None:
+                    self.started=time.monotonic()
+                if len(batch) >= args.zmq_batch:
+                    del self.batches[topic]
+                    self.send(batch)
+
+        def flusher(self):
+            while not self.stop.wait(self.maxage/2):
+                with self.lock:
+                    if self.started is not None and time.monotonic()-self.started > self.maxage:
+                        self.flush()
+                    self.drain()
+
+        def flush(self):
+            for batch in self.batches.values():
+                self.send(batch)
+            self.batches.clear()
+            self.started=None
+
+        def send(self, frames):
+            if args.zmq_frames: # records are bytes and can be concatenated
+                parts=[b"".join(frames)] if args.zmq_join else frames
+            elif args.zmq_join:
+                parts=["\n".join(frames).encode()]
+            else:
+                parts=[msg.encode() for msg in frames]
+            if not args.zmq_backlog:
+                try:
+                    self.socket.send_multipart(parts, self.flags)
+                except zmq.Again:
+                    self.dropped+=1
+                return
+            self.backlog.append(parts)
+            self.drain()
+            if len(self.backlog) > args.zmq_backlog:
+                self.backlog.popleft()
+                self.dropped+=1
+
+        def drain(self):
+            while self.backlog:
+                try:
+                    self.socket.send_multipart(self.backlog[0], zmq.NOBLOCK)
+                except zmq.Again:
+                    return
+                self.backlog.popleft()
+
+        def close(self):
+            """Send what's left, waiting at most a second for subscribers"""
+            if self.thread is not None:
+                self.stop.set()
+                self.thread.join()
+            self.socket.setsockopt(zmq.SNDTIMEO, 1000)
+            self.flags=0
+            self.flush()
+            while self.backlog:
+                try:
+                    self.socket.send_multipart(self.backlog[0])
+                except zmq.Again:
+                    self.dropped+=len(self.backlog)
+                    self.backlog.clear()
+                    break
+                self.backlog.popleft()
+
+    publisher = Publisher(socket)
+
+if args.output == "zmq":
+    emit=publisher.emit
+elif args.output == "sigmf":
+    def emit(msg):
+        print(msg, end=",\n", file=sigmfout)
+elif args.output == "frames":
+    sys.stdout.buffer.write(framepack.MAGIC)
+    emit=sys.stdout.buffer.write
+else:
+    emit=print
+
 def stats_thread(stats):
     ltime=time.time()
     lline=0
@@ -233,13 +511,13 @@ def stats_thread(stats):
         progress=""
         if 'files' in stats and stats['files']>1:
             progress+="%d/%d:"%(stats['fileno'],stats['files'])
-        if 'size' in stats and stats['size']>0:
-            try:
-                pos=os.lseek(fileinput.fileno(),0,os.SEEK_CUR)
-            except OSError:
-                pos=0
-            progress+="%4.1f%%"%(100*pos/stats['size'])
-            eta=stats['size']/pos*td - td
+        try:
+            (pos, size)=stats['progress']()
+        except (OSError, ValueError, KeyError):
+            (pos, size)=(0, 0)
+        if size>0 and pos>0:
+            progress+="%4.1f%%"%(100*pos/size)
+            eta=size/pos*td - td
             te="%02d:%02d"%(eta/60%60,eta%60)
             if eta>60*60:
                 te="%02d:"%(eta/60/60)+te
@@ -250,6 +528,9 @@ def stats_thread(stats):
             hdr+=" l:%6d"%stats['in']
         if args.output=='zmq':
             hdr+=" %2d clients"%stats['clients']
+            if args.zmq_backlog:
+                hdr+=" backlog:%d"%len(publisher.backlog)
+            hdr+=" drop:%d"%publisher.dropped
         print (hdr, "[%.1f l/s] filtered:%3d%%"%((nowl-lline)/(now-ltime),100*(1-stats['out']/(stats['in'] or 1))), end=eol, file=statsfile)
         ltime=now
         lline=nowl
@@ -257,28 +538,46 @@ def stats_thread(stats):
 
 selected=[]
 
-def openhook(filename, mode):
+def openhook(filename, mode, resume=None, output=True):
     base, ext = os.path.splitext(os.path.basename(filename))
 
-    if base.endswith('.bits'):
+    if base.endswith('.bits') or base.endswith('.pbits'):
         base = os.path.splitext(base)[0]
-    if args.output == 'file':
-        sys.stdout = open(f'{base}.parsed', 'wt')
-
-    if ext == '.gz':
-        import gzip
-        return gzip.open(filename, 'rt')
-    elif ext == '.bz2':
-        import bz2
-        return bz2.open(filename, 'rt')
-    elif ext == '.xz':
-        import lzma
-        return lzma.open(filename, 'rt')
-    else:
-        return open(filename, 'rt')
+    if args.output == 'file' and output:
+        if resume is None:
+            sys.stdout = open(f'{base}.parsed', 'wt')
+        else:
+            sys.stdout = open(f'{base}.parsed', 'r+t')
+            truncate_output(sys.stdout, resume['output'])
+
+    if bitspack.is_packed(filename):
+        return bitspack.Reader(filename)
+    start=args.start_offset
+    if resume is not None and resume['offset'] is not None:
+        start=resume['offset']
+    # compressed files are decompressed in a background thread,
+    # uncompressed ones are mapped and skip to --start/--end with an index
+    return timeindex.open_lines(filename, bitsparser.raw_globalns, args.start, args.end,
+            args.use_index, start, args.stop_offset)
+
+def file_progress(infile):
+    """(bytes read, total bytes) of an input file"""
+    if hasattr(infile, 'progress'):
+        return infile.progress()
+    fd=infile.fileno()
+    return (os.lseek(fd,0,os.SEEK_CUR), os.fstat(fd).st_size)
 
 
 def do_input():
+    if args.jobs > 1:
+        do_input_jobs()
+        return
+    if args.merge:
+        do_input_merge()
+        return
+    if args.remainder:
+        do_input_files()
+        return
     if True:
         if args.do_stats:
             stats['files']=len(args.remainder)
@@ -287,25 +586,172 @@ def do_input():
             if args.do_stats:
                 if fileinput.isfirstline():
                     stats['fileno']+=1
-                    stat=os.fstat(fileinput.fileno())
-                    stats['size']=stat.st_size
+                    stats['progress']=lambda: file_progress(fileinput) # has fileno(), too
                 stats['in']+=1
                 if poller is not None and len(poller.poll(0))>0:
                     zmq_xpub(poller, stats)
-            if args.min_confidence is not None:
-                q=bitsparser.Message(line.strip())
-                try:
-                    if q.confidence<args.min_confidence:
-                        continue
-                except AttributeError:
-                    continue
-                perline(q.upgrade())
-            else:
-                perline(bitsparser.Message(line.strip()).upgrade())
+            perrawline(line, fileinput.lineno())
     else:
         print("Unknown input mode.", file=sys.stderr)
         exit(1)
 
+def do_input_files():
+    """Input loop for named files, reads them without the per-line overhead
+    of fileinput (and packed files, which fileinput can't read)"""
+    if args.do_stats:
+        stats['files']=len(args.remainder)
+        stats['fileno']=0
+    lineno=0
+    first=0
+    if resume is not None:
+        (first, lineno)=(resume['file'], resume['lineno'])
+    for fileidx, filename in enumerate(args.remainder):
+        if fileidx < first:
+            continue
+        if filename == '-':
+            infile=sys.stdin
+        else:
+            infile=openhook(filename, 'r', ckpt and ckpt.resume(fileidx))
+        if args.do_stats:
+            stats['fileno']=fileidx+1
+            stats['progress']=lambda: file_progress(infile)
+        lines=infile
+        if ckpt is not None:
+            lines=ckpt.track(infile, fileidx, lineno)
+        for line in lines:
+            lineno+=1
+            if args.do_stats:
+                stats['in']+=1
+                if poller is not None and len(poller.poll(0))>0:
+                    zmq_xpub(poller, stats)
+            perrawline(line, lineno)
+        if infile is not sys.stdin:
+            infile.close()
+
+def do_input_merge():
+    """Input loop for --merge: reads all files at once, passes their lines
+    on ordered by time and without frames already seen by another receiver.
+    Output of -o file is named after the first file."""
+    infiles=[]
+    for fileidx, filename in enumerate(args.remainder or ['-']):
+        if filename == '-':
+            infiles.append(sys.stdin)
+        else:
+            infiles.append(openhook(filename, 'r', output=(fileidx == 0)))
+    if args.do_stats:
+        stats['progress']=lambda: tuple(map(sum, zip(*[file_progress(f) for f in infiles])))
+    dedup=framemerge.Dedup(window=int(args.merge_window*10**6))
+    lineno=0
+    for line in dedup.frames(framemerge.merge(infiles)):
+        lineno+=1
+        if args.do_stats:
+            stats['in']+=1
+            if poller is not None and len(poller.poll(0))>0:
+                zmq_xpub(poller, stats)
+        perrawline(line, lineno)
+    for infile in infiles:
+        if infile is not sys.stdin:
+            infile.close()
+    if args.do_stats:
+        print("%d duplicate frames dropped" % dedup.dropped, end=eolnl, file=statsfile)
+
+def perrawline(line, lineno=None):
+    if isinstance(line, str): # records from packed files are already split
+        line=line.strip()
+    if prefilter is not None and not prefilter(line):
+        return
+    q=bitsparser.Message(line, lineno, rawparser)
+    if timebounds and (q.parse_error or not timeindex.in_range(q.globalns, args.start, args.end)):
+        return
+    if args.min_confidence is not None:
+        try:
+            if q.confidence<args.min_confidence:
+                return
+        except AttributeError:
+            return
+    perline(q.upgrade())
+
+def do_input_jobs():
+    import multiprocessing
+    from itertools import islice
+
+    if args.do_stats:
+        stats['files']=len(args.remainder)
+        stats['fileno']=0
+
+    def chunks(infile, lineno):
+        while True:
+            lines=list(islice(infile, args.chunksize))
+            if not lines:
+                break
+            # timestamps of files without start time depend on all previous lines
+            tstate=(rawparser.tsoffset, rawparser.maxts)
+            rawparser.track_time(lines)
+            yield (lineno, lines, tstate)
+            lineno+=len(lines)
+
+    lineno=1
+    # fork, as this script has no __main__ guard and must not be re-executed
+    with multiprocessing.get_context('fork').Pool(args.jobs) as pool:
+        for filename in args.remainder or ['-']:
+            if filename == '-':
+                infile=sys.stdin
+            else:
+                infile=openhook(filename, 'r')
+            if args.do_stats:
+                stats['fileno']+=1
+                stats['progress']=lambda: file_progress(infile)
+
+            # results are returned in input order
+            for (lines, output, errors, sel, errorstats, out) in pool.imap(perchunk, chunks(infile, lineno)):
+                lineno+=lines
+                for msg in output:
+                    emit(msg)
+                if errors:
+                    args.errorfile.write(errors)
+                selected.extend(sel)
+                if errorstats:
+                    for msg, count in errorstats.items():
+                        args.errorstats[msg]=args.errorstats.get(msg, 0)+count
+                if args.do_stats:
+                    stats['in']+=lines
+                    stats['out']+=out
+                    if poller is not None and len(poller.poll(0))>0:
+                        zmq_xpub(poller, stats)
+
+            if infile is not sys.stdin:
+                infile.close()
+
+def perchunk(chunk):
+    """Worker side of --jobs: process lines and return everything perline() produced"""
+    global emit, selected
+    (lineno, lines, (rawparser.tsoffset, rawparser.maxts))=chunk
+    rawparser.tswarning=True # already done by track_time()
+
+    output=[]
+    emit=output.append
+    selected=[]
+    if args.errorfile is not None:
+        args.errorfile=io.StringIO()
+    if isinstance(args.errorstats, collections.abc.Mapping):
+        args.errorstats={}
+    if args.do_stats:
+        stats['out']=0
+
+    for idx, line in enumerate(lines):
+        perrawline(line, lineno+idx)
+
+    errors=None
+    if args.errorfile is not None:
+        errors=args.errorfile.getvalue()
+    return (len(lines), output, errors, selected, args.errorstats, stats['out'] if args.do_stats else 0)
+
+def has_field(q, attr):
+    # instance attributes only; fields decoded on access count if they get set
+    if attr in q.__dict__:
+        return True
+    return isinstance(getattr(type(q), attr, None), bitsparser.lazy) and hasattr(q, attr)
+
 def perline(q):
     if args.dosatclass is True:
         sat=satclass.classify(q.frequency,q.globaltime)
@@ -329,40 +775,46 @@ def perline(q):
             return
         q.descramble_extra=""
 #    if linefilter['type']!="All" and type(q).__name__ != linefilter['type']:
-    if args.linefilter['type']!="All" and not issubclass(type(q),globals()['bitsparser'].__dict__[args.linefilter['type']]):
+    if args.linefilter['class'] and not issubclass(type(q),args.linefilter['class']):
         return
-    if args.linefilter['attr'] and args.linefilter['attr'] not in q.__dict__:
+    if args.linefilter['attr'] and not has_field(q, args.linefilter['attr']):
         return
-    if args.linefilter['check'] and not eval(args.linefilter['check']):
+    if args.linefilter['check_fn'] and not args.linefilter['check_fn'](q):
         return
     if args.do_stats:
         stats["out"]+=1
     if args.output == "err":
         if q.error:
-            selected.append(q)
+            selected.append(bitsparser.FrameRecord(q))
     elif args.output == "sat":
         if not q.error:
-            selected.append(q)
+            selected.append(bitsparser.FrameRecord(q))
     elif args.output == "plot":
-        selected.append(q)
+        selected.append(bitsparser.FrameRecord(q, plotfields, pretty=False))
     elif args.output == "line" or args.output == "file":
         if q.error:
-            print(q.pretty()+" ERR:"+", ".join(q.error_msg))
+            emit(q.pretty()+" ERR:"+", ".join(q.error_msg))
         else:
             if not args.ofmt:
-                print(q.pretty())
+                emit(q.pretty())
             else:
-                print(" ".join([str(q.__dict__[x]) for x in args.ofmt]))
+                emit(" ".join([str(getattr(q, x)) for x in args.ofmt]))
     elif args.output == "zmq":
-        socket.send_string(q.pretty())
+        if not args.zmq_frames:
+            emit(q.pretty())
+        elif "uplink" in q.__dict__:
+            emit(framepack.pack(q, q.pretty()))
+    elif args.output == "frames":
+        if "uplink" in q.__dict__:
+            emit(framepack.pack(q, q.pretty()))
     elif args.output == "json":
         if q.error: return
-        for attr in ["parse_error", "error_msg", "descrambled", "bitstream_bch", "bitstream_raw", "rs6c", "rs6m", "rs8c", "rs8m", "idata", "payload_f", "payload_r", "descramble_extra", "swapped", "da_ta", "vdata", "header", "freq_print"]:
+        for attr in ["parse_error", "error_msg", "descrambled", "bitstream_bch", "bitstream_raw", "rs6c", "rs6m", "rs8c", "rs8m", "idata", "payload_f", "payload_r", "descramble_extra", "swapped", "da_ta", "vdata", "header", "freq_print", "parser"]:
             if attr in q.__dict__:
                 del q.__dict__[attr]
         q.type = type(q).__name__
         try:
-            print(json.dumps(q.__dict__))
+            emit(json.dumps(q.__dict__))
         except Exception as e:
             print("Couldn't serialize: ", q.__dict__, file=sys.stderr)
             raise e
@@ -388,14 +840,14 @@ def perline(q):
             desc+="_"+q.msgtype
         else:
             desc=type(q).__name__
-        print(json.dumps({
+        emit(json.dumps({
             "core:comment": "Frame #%d: "%int(q.id)+type(q).__name__,
             "core:description": desc,
             "core:freq_lower_edge": q.frequency-20e3,
             "core:freq_upper_edge": q.frequency+20e3,
             "core:sample_count": int(q.symbols * (sr/SYMBOLS_PER_SECOND)),
             "core:sample_start": int(q.timestamp * (sr/1000))
-            }), end=",\n", file=sigmfout)
+            }))
     else:
         print("Unknown output mode.", file=sys.stderr)
         exit(1)
@@ -412,10 +864,15 @@ if args.do_stats:
     sthread = Thread(target = stats_thread, args = [stats], daemon= True, name= 'stats')
     sthread.start()
 
+stopped=False
 try:
     do_input()
+    if ckpt is not None:
+        ckpt.remove()
 except KeyboardInterrupt:
     pass
+except checkpoint.Stopped:
+    stopped=True
 except BrokenPipeError as e:
     print(e, file=sys.stderr, end=eolnl if args.do_stats else None)
 
@@ -424,9 +881,16 @@ if args.do_stats:
     sthread.join()
 
 if args.output=='zmq':
+    publisher.close()
+    if publisher.dropped:
+        print("%d zmq messages dropped" % publisher.dropped, file=sys.stderr)
     socket.close()
     context.term()
 
+if stopped:
+    print("Stopped, checkpoint saved to", args.checkpoint, file=sys.stderr)
+    exit(1)
+
 if args.sigmffile is not None:
     print("{}]}", file=sigmfout)
     sigmfout.close()
@@ -482,11 +946,6 @@ if args.output == "err":
         for m in sort[msg]:
             print("- "+m.pretty())
 
-def plotsats(plt, _s, _e):
-    for ts in range(int(_s),int(_e),10):
-        for v in satclass.timelist(ts):
-            plt.scatter( x=v[0], y=v[1], c=int(v[2]), alpha=0.3, edgecolor="none", vmin=10, vmax=90)
-
 if args.output == "plot":
     name="%s over %s"%(args.plotargs[1],args.plotargs[0])
     if len(args.plotargs)>2:
@@ -508,20 +967,16 @@ if args.output == "plot":
     plt.xlabel(args.plotargs[0])
     plt.ylabel(args.plotargs[1])
     if args.plotargs[0]=="time":
-        args.plotargs[0]="globalns"
         def format_date(x, _pos=None):
             return datetime.datetime.fromtimestamp(x/10**9).strftime('%Y-%m-%d %H:%M:%S')
         plt.gca().xaxis.set_major_formatter(ticker.FuncFormatter(format_date))
         plt.gcf().autofmt_xdate()
 
-    if False:
-        plotsats(plt,selected[0].globaltime,selected[-1].globaltime)
-
     for m in selected:
-        xl.append(m.__dict__[args.plotargs[0]])
-        yl.append(m.__dict__[args.plotargs[1]])
+        xl.append(m.values[0])
+        yl.append(m.values[1])
         if len(args.plotargs)>2:
-            cl.append(m.__dict__[args.plotargs[2]])
+            cl.append(m.values[2])
 
     if len(args.plotargs)>2:
         plt.scatter(x = xl, y= yl, c= cl)
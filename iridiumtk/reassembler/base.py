@@ -1,11 +1,13 @@
 #!/usr/bin/env python3
 # vim: set ts=4 sw=4 tw=0 et pm=:
 
+import re
 import sys
 import datetime
 import math
 
-from util import base_freq, channel_width, channelize_str, parse_channel
+from util import base_freq, channel_width, channelize_str, parse_channel, lazy, fmt_iritime
+import framepack
 from ..config import config
 
 if sys.version_info[0]==3 and sys.version_info[1]<8:
@@ -25,55 +27,167 @@ Z=Zulu()
 
 pwarn=False
 
+# parse_name() results, all frames of a file have one of a few names
+names={}
+
+_page=re.compile(r'PAGE\(tmsi:([0-9a-f]+) msc_id:([0-9]+)\)')
+
+def _ira(g, d):
+    (sat, beam, xyz, lat, lon, alt, pages)=g
+    d["sat"]=int(sat)
+    d["beam"]=int(beam)
+    if xyz is not None:
+        d["xyz"]=tuple(map(int, xyz.split(",")))
+    d["lat"]=float(lat)
+    d["lon"]=float(lon)
+    d["alt"]=int(alt)
+    d["pages"]=[(int(tmsi, 16), int(msc_id)) for (tmsi, msc_id) in _page.findall(pages)]
+
+def _ibc(g, d):
+    (sat, beam, unknown01, slot, iri_time_str)=g
+    d["sat"]=int(sat)
+    d["beam"]=int(beam)
+    d["unknown01"]=int(unknown01)
+    d["slot"]=int(slot)
+    if iri_time_str is not None:
+        d["iri_time_str"]=iri_time_str
+
+def _ida(g, d):
+    (cont, flag, ctr, length, payload)=g
+    d["cont"]=int(cont)
+    d["flag"]=int(flag)
+    d["ctr"]=int(ctr, 2)
+    d["length"]=int(length)
+    d["payload"]=bytes().fromhex(payload.replace('.',' ').replace('!',' '))
+
+def _itl(g, d):
+    (plane, satno)=g
+    d["plane"]=int(plane)
+    if satno is not None:
+        d["satno"]=int(satno)
+
+# Fields in the data of text lines, named as in framepack.unpack_fields():
+# type: (match/search of the regex, function setting the fields from its groups).
+# IDA lines only match with CRC:OK.
+schema={
+    "IRA:": (re.compile(r'sat:(\d+) beam:(\d+) (?:(?:aps|xyz)=\(([+-]?[0-9]+,[+-]?[0-9]+,[+-]?[0-9]+)\) )?pos=\(([+-][0-9.]+)/([+-][0-9.]+)\) alt=(-?[0-9]+) .* bc_sb:\d+ ?(.*)').search, _ira),
+    "IBC:": (re.compile(r' sat:(\d+) cell:(\d+) (\d) slot:(\d)(?:.* time:([0-9:T-]+(?:\.\d+)?Z))?').search, _ibc),
+    "IDA:": (re.compile(r'.* cont=(\d) (\d) ctr=(\d+) \d+ len=(\d+) 0:.000 \[([0-9a-f.!]*)\]\s+..../.... CRC:OK').match, _ida),
+    "ITL:": (re.compile(r'V[12] OK(?:\[\d\])? P(\d+) (?:---|R\d\d|S(\d+)) ').search, _itl),
+}
+
+# fields set by unpack_fields()
+fields=framepack.fields|{"iri_time_str", "plane", "satno"}
+
 class MyObject(object):
-    def enrich(self, channelize=False):
-        self.frequency=parse_channel(self.frequency)
+    """Line split into its fields (see make_object()).
 
+    The header fields are kept as text (_mstime, _frequency, _confidence,
+    _level) and only converted when used: frequency, confidence, nstime,
+    mstime, level, noise, snr and the fields of enrich_name().
+    """
+    typed=False # data is text
+    unpacked=False
+
+    def __getattr__(self, name):
+        if name in fields and not self.unpacked:
+            self.unpacked=True
+            self.unpack_fields()
+            return getattr(self, name)
+        raise AttributeError(name)
+
+    def unpack_fields(self):
+        """Set the fields in data (see schema)"""
+        if self.typ not in schema:
+            return
+        (match, convert)=schema[self.typ]
+        m=match(self.data)
+        if m is not None:
+            convert(m.groups(), self.__dict__)
+
+    def copy(self):
+        """Copy for another mode (see MultiMode)"""
+        q=self.__class__.__new__(self.__class__)
+        q.__dict__.update(self.__dict__)
+        return q
+
+    def enrich(self, channelize=False):
         if channelize:
             self.freq_print=channelize_str(self.frequency)
 
-        if len(self.name) > 3 and self.name[1]=='-':
-            self.ftype=self.name[0]
-            self.starttime, _, self.attr = self.name[2:].partition('-')
-        else:
-            self.ftype = self.starttime = self.attr = ''
+    def _parse_frequency(self):
+        self.frequency=parse_channel(self._frequency)
+    frequency=lazy(_parse_frequency)
 
-        self.confidence=int(self.confidence.strip("%"))
+    def _parse_confidence(self):
+        self.confidence=int(self._confidence.strip("%"))
+    confidence=lazy(_parse_confidence)
 
+    def _parse_mstime(self):
         # conversion without precision loss
-        ms, _, frac = self.mstime.partition('.')
+        ms, _, frac = self._mstime.partition('.')
         assert(len(frac) <= 6)
         frac += '0'*(6-len(frac))
         self.nstime = int(ms) * 1000000 + int(frac)
 
-        self.mstime = float(self.mstime)
+        self.mstime = float(self._mstime)
+    nstime=lazy(_parse_mstime)
+    mstime=lazy(_parse_mstime)
 
-        if '|' in self.level:
-            self.level, self.noise, self.snr = self.level.split('|')
-            self.snr = float(self.snr)
-            self.noise = float(self.noise)
-            self.level=float(self.level)
+    def _parse_level(self):
+        if '|' in self._level:
+            level, noise, snr = self._level.split('|')
+            self.snr = float(snr)
+            self.noise = float(noise)
+            self.level=float(level)
         else:
             self.snr=None
             self.noise=None
-            if float(self.level)==0:
-                self.level+="1"
+            level=self._level
+            if float(level)==0:
+                level+="1"
             try:
-                self.level=math.log(float(self.level),10)*20
+                self.level=math.log(float(level),10)*20
             except ValueError:
-                print("Invalid signal level:",self.level, file=sys.stderr)
+                print("Invalid signal level:",level, file=sys.stderr)
                 self.level=0
+    level=lazy(_parse_level)
+    noise=lazy(_parse_level)
+    snr=lazy(_parse_level)
 
-        if self.ftype=='p':
-            self.time=float(self.starttime)+self.mstime/1000
+    def enrich_name(self):
+        """ftype, starttime, attr, perfect and time from name and mstime"""
+        try:
+            self.ftype, self.starttime, self.attr, self.perfect, start = names[self.name]
+        except KeyError:
+            start = self.parse_name()
+            names[self.name] = (self.ftype, self.starttime, self.attr, self.perfect, start)
+
+        if start is not None:
+            self.time=start+self.mstime/1000
         elif self.ftype=='j': # deperec
             self.time=self.mstime
         else:
+            self.time=self.mstime/1000
+
+    def parse_name(self):
+        """Set ftype, starttime, attr and perfect, returns the start time
+        of the recording (None if unknown)"""
+        if len(self.name) > 3 and self.name[1]=='-':
+            self.ftype=self.name[0]
+            self.starttime, _, self.attr = self.name[2:].partition('-')
+        else:
+            self.ftype = self.starttime = self.attr = ''
+
+        start=None
+        if self.ftype=='p':
+            start=float(self.starttime)
+        elif self.ftype!='j': # deperec
             try:
                 # XXX: Does not handle really old time format.
-                self.time=float(self.starttime)+self.mstime/1000
+                start=float(self.starttime)
             except ValueError:
-                self.time=self.mstime/1000
+                pass
 
         if self.attr.startswith("e"):
             if self.attr != 'e000':
@@ -90,6 +204,109 @@ class MyObject(object):
                 if pwarn is False:
                     pwarn = True
                     print("'perfect' requested, but no EC info found", file=sys.stderr)
+        return start
+
+    ftype=lazy(enrich_name)
+    starttime=lazy(enrich_name)
+    attr=lazy(enrich_name)
+    perfect=lazy(enrich_name)
+    time=lazy(enrich_name)
+
+class FrameObject(MyObject):
+    """Frame read from a framepack record.
+
+    Numbers don't need to be converted by enrich(). The decoded fields of
+    the record (see framepack.unpack_fields()) can be used instead of
+    parsing data, they are only unpacked when used.
+    """
+    typed=True
+
+    def __init__(self, rec):
+        self.rec=rec
+        self.span=framepack.unpack_header(rec, self)
+        self.symbols="%03d"%self.symbols
+        self.uldl="UL" if self.uplink else "DL"
+
+    def unpack_fields(self):
+        if self.typ.encode('ascii') in framepack.typed:
+            framepack.unpack_fields(self.rec, self.span[2], self)
+        else:
+            super().unpack_fields()
+
+    def _fmt_iri_time(self):
+        if self.iri_time is not None:
+            self.iri_time_str=fmt_iritime(self.iri_time)[1]
+    iri_time_str=lazy(_fmt_iri_time)
+
+    def _decode_line(self):
+        (start, _, end)=self.span
+        self.line=self.rec[start:end].decode('utf-8', 'surrogateescape')
+    line=lazy(_decode_line)
+
+    def _decode_data(self):
+        # text after the header fields, as with text input
+        (_, start, end)=self.span
+        self.data=self.rec[start:end].decode('utf-8', 'surrogateescape')+"\n"
+    data=lazy(_decode_data)
+
+    def _nstime_ms(self):
+        self.mstime=self.nstime/1000000
+    mstime=lazy(_nstime_ms)
+
+    def enrich(self, channelize=False):
+        if channelize:
+            self.freq_print=channelize_str(self.frequency)
+
+        if self.snr is None:
+            if self.level==0:
+                self.level=0.0001
+            try:
+                self.level=math.log(self.level,10)*20
+            except ValueError:
+                print("Invalid signal level:",self.level, file=sys.stderr)
+                self.level=0
+
+class ParsedObject(FrameObject):
+    """Frame parsed in the same process (see pipeline.py).
+
+    Has the same fields as a FrameObject of its record, taken from the
+    message directly. The text line is only formatted when used.
+    """
+    def __init__(self, msg):
+        self.msg=msg
+        framepack.message_header(msg, self)
+        self.symbols="%03d"%self.symbols
+        self.uldl="UL" if self.uplink else "DL"
+
+    def unpack_fields(self):
+        typ=self.typ.encode('ascii')
+        if typ in framepack.typed:
+            framepack.unpack_fields(framepack.typed[typ](self.msg), 0, self, typ)
+        else:
+            MyObject.unpack_fields(self)
+
+    def _format_line(self):
+        self.line=self.msg.pretty()
+    line=lazy(_format_line)
+
+    def _format_data(self):
+        self.data=self.line.split(None, 8)[8]+"\n"
+    data=lazy(_format_data)
+
+def make_object(line):
+    """Object of an input line (text, framepack record or already an
+    object), None if the line can't be parsed"""
+    if isinstance(line, MyObject): # see pipeline.py, MultiMode
+        return line
+    if not isinstance(line, str): # framepack record
+        return FrameObject(line)
+    try:
+        q=MyObject()
+        q.typ,q.name,q._mstime,q._frequency,q._confidence,q._level,q.symbols,q.uldl,q.data=line.split(None,8)
+        return q
+    except ValueError:
+        print("Couldn't parse input line: ",line, end=' ', file=sys.stderr)
+        return None
 
 class Reassemble(object):
     def __init__(self):
@@ -98,23 +315,36 @@ class Reassemble(object):
     stat_filter=0
     def run(self,producer):
         for line in producer:
-            res=self.filter(line)
-            if res != None:
-                self.stat_filter+=1
-                zz=self.process(res)
-                if zz != None:
-                    for mo in zz:
-                        self.consume(mo)
+            self.feed(line)
         self.end()
+    def types(self):
+        """Line types ("IDA:", ...) filter() accepts (from topic), None for all"""
+        topics=getattr(self, "topic", None)
+        if topics is None:
+            return None
+        if not isinstance(topics, list):
+            topics=[topics]
+        return {t+":" for t in topics}
+    def skip_types(self, lines, types):
+        """Lines (text or framepack records) of one of types, the others
+        are only counted, without splitting them"""
+        types=types|{t.encode("ascii") for t in types}
+        for line in lines:
+            if line[:4] in types:
+                yield line
+            else:
+                self.stat_line+=1
+    def feed(self,line):
+        res=self.filter(line)
+        if res != None:
+            self.stat_filter+=1
+            zz=self.process(res)
+            if zz != None:
+                for mo in zz:
+                    self.consume(mo)
     def filter(self,line):
         self.stat_line+=1
-        try:
-            q=MyObject()
-            q.typ,q.name,q.mstime,q.frequency,q.confidence,q.level,q.symbols,q.uldl,q.data=line.split(None,8)
-            return q
-        except ValueError:
-            print("Couldn't parse input line: ",line, end=' ', file=sys.stderr)
-            return None
+        return make_object(line)
 
     def end(self):
         if self.stat_line>0:
@@ -122,4 +352,71 @@ class Reassemble(object):
         else:
             print("No lines?")
 
+class MultiMode(object):
+    """Run several modes in one pass over the input (-m mode1,mode2,...)
+
+    Each line is only split once and only offered to the modes whose topic
+    matches its type (and to all modes without topic). Modes sharing a line
+    get a copy() of it each. While a mode runs, sys.stdout is its output
+    file, so it writes the same as when run alone.
+    """
+    def __init__(self, modes):
+        self.modes=modes # [(mode, outfile)]
+        self.bytype={}
+        self.skipped=0
+
+    def types(self):
+        """Line types any of the modes accepts, None for all"""
+        types=set()
+        for (zx, _) in self.modes:
+            t=zx.types()
+            if t is None:
+                return None
+            types|=t
+        return types
+
+    def skip_types(self, lines, types):
+        types=types|{t.encode("ascii") for t in types}
+        for line in lines:
+            if line[:4] in types:
+                yield line
+            else:
+                self.skipped+=1
+
+    def targets(self, typ):
+        """Modes which want lines of type typ ("IDA:", ...)"""
+        targets=[]
+        for m in self.modes:
+            types=m[0].types()
+            if types is None or typ in types:
+                targets.append(m)
+        self.bytype[typ]=targets
+        return targets
+
+    def run(self, producer):
+        stdout=sys.stdout
+        bytype=self.bytype
+        lines=0
+        try:
+            for line in producer:
+                lines+=1
+                q=make_object(line)
+                if q is None:
+                    continue
+                targets=bytype.get(q.typ)
+                if targets is None:
+                    targets=self.targets(q.typ)
+                if len(targets)==1:
+                    (zx, sys.stdout)=targets[0]
+                    zx.feed(q)
+                else:
+                    for (zx, sys.stdout) in targets:
+                        zx.feed(q.copy())
+            for (zx, sys.stdout) in self.modes:
+                zx.stat_line=lines+self.skipped # lines not offered were skipped by type
+                zx.end()
+                sys.stdout.flush()
+        finally:
+            sys.stdout=stdout
+
 modes=[]
@@ -29,6 +29,7 @@ class InfoIRAMAP(ReassembleIRA):
         from skyfield.constants import tau, DAY_S
         import numpy as np
 
+        self.topic="IRA"
         filename="tracking/iridium-NEXT.txt"
         self.satlist = load.tle_file(filename)
         if config.verbose:
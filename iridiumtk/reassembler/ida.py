@@ -17,28 +17,24 @@ class ReassembleIDA(Reassemble):
     def __init__(self):
         self.topic="IDA"
         pass
+    r_crc=re.compile(r'.* CRC:OK')
     def filter(self,line):
         q=super().filter(line)
         if q==None: return None
         if q.typ!="IDA:": return None
 
-        qqq=re.compile(r'.* CRC:OK')
-        if not qqq.match(q.data):
+        if q.typed:
+            if not q.crc_ok or q.zero1!=0:
+                return None
+        elif not self.r_crc.match(q.data):
             return None
-
-        p=re.compile(r'.* cont=(\d) (\d) ctr=(\d+) \d+ len=(\d+) 0:.000 \[([0-9a-f.!]*)\]\s+..../.... CRC:OK')
-        m=p.match(q.data)
-        if(not m):
+        elif not hasattr(q, "payload"):
             print("Couldn't parse IDA: ",q.data, file=sys.stderr)
             return None
-
-        q.ul=        (q.uldl=='UL')
-        q.f1=         m.group(1)
-        q.f2=     int(m.group(2))
-        q.ctr=    int(m.group(3),2)
-        q.length= int(m.group(4))
-        q.data=   m.group(5)
-        q.cont=(q.f1=='1')
+        q.ul=     (q.uldl=='UL')
+        q.f2=     q.flag
+        q.data=   bytes(q.payload)
+        q.cont=   (q.cont==1)
         q.enrich()
         global _starttime
         if _starttime is None: _starttime=int(q.starttime)
@@ -58,7 +54,7 @@ class ReassembleIDA(Reassemble):
         if (self.otime-1)<=m.time<=(self.otime+1) and self.odata==m.data and (self.ofreq-200)<m.frequency<(self.ofreq+200):
             self.stat_dupes+=1
             if config.verbose:
-                print("dupe: ",m.time,"(",m.cont,m.ctr,")",m.data)
+                print("dupe: ",m.time,"(",m.cont,m.ctr,")",m.data.hex('.'))
             return
         self.otime=m.time
         self.odata=m.data
@@ -69,16 +65,15 @@ class ReassembleIDA(Reassemble):
         for (idx,(freq,time,ctr,dat,cont,ul)) in enumerate(self.buf[:]):
             if (freq-260)<m.frequency<(freq+260) and time[-1]<=m.time<=(time[-1]+280) and (ctr+1)%8==m.ctr and ul==m.ul:
                 del self.buf[idx]
-                dat=dat+"."+m.data
+                dat=dat+m.data
                 time.append(m.time)
                 if m.cont:
                     self.buf.append([m.frequency,time,m.ctr,dat,m.cont,m.ul])
                 else:
                     self.stat_ok+=1
                     if config.verbose:
-                        print(">assembled: [%s] %s"%(",".join(["%s"%x for x in time+[m.time]]),dat))
-                    data=bytes().fromhex( dat.replace('.',' ').replace('!',' ') )
-                    return [[data,m.time,ul,m.level,freq]]
+                        print(">assembled: [%s] %s"%(",".join(["%s"%x for x in time+[m.time]]),dat.hex('.')))
+                    return [[dat,m.time,ul,m.level,freq]]
                 self.stat_fragments+=1
                 ok=True
                 break
@@ -86,30 +81,28 @@ class ReassembleIDA(Reassemble):
             pass
         elif m.ctr==0 and not m.cont:
             if config.verbose:
-                print(">single: [%s] %s"%(m.time,m.data))
-            data=bytes().fromhex( m.data.replace('.',' ').replace('!',' ') )
-            return [[data,m.time,m.ul,m.level,m.frequency]]
+                print(">single: [%s] %s"%(m.time,m.data.hex('.')))
+            return [[m.data,m.time,m.ul,m.level,m.frequency]]
         elif m.ctr==0 and m.cont: # New long packet
             self.stat_fragments+=1
             if config.verbose:
-                print("initial: ",m.time,"(",m.cont,m.ctr,")",m.data)
+                print("initial: ",m.time,"(",m.cont,m.ctr,")",m.data.hex('.'))
             self.buf.append([m.frequency,[m.time],m.ctr,m.data,m.cont,m.ul])
         elif m.ctr>0:
             self.stat_broken+=1
             self.stat_fragments+=1
             if config.verbose:
-                print("orphan: ",m.time,"(",m.cont,m.ctr,")",m.data)
+                print("orphan: ",m.time,"(",m.cont,m.ctr,")",m.data.hex('.'))
             pass
         else:
-             print("unknown: ",m.time,m.cont,m.ctr,m.data)
+             print("unknown: ",m.time,m.cont,m.ctr,m.data.hex('.'))
         # expire packets
         for (idx,(freq,time,ctr,dat,cont,ul)) in enumerate(self.buf[:]):
             if time[-1]+1000<=m.time:
                 self.stat_broken+=1
                 del self.buf[idx]
                 if config.verbose:
-                    print("timeout:",time,"(",cont,ctr,")",dat)
-                data=bytes().fromhex( dat.replace('.',' ').replace('!',' ') )
+                    print("timeout:",time,"(",cont,ctr,")",dat.hex('.'))
                 #could be put into assembled if long enough to be interesting?
                 break
     def end(self):
@@ -1042,12 +1035,12 @@ class ReassembleIDALAP(ReassembleIDA):
             print("%15.6f %.3f %s %s"%(time,level,ul,".".join("%02x"%ord(x) for x in data)))
 
 class ReassembleIDALAPPCAP(ReassembleIDALAP):
-    def __init__(self):
-        super().__init__()
-        global outfile
-        if outfile == sys.stdout: # Force file, since it's binary
-            config.output="%s.%s" % (config.outbase, "pcap")
-        outfile=open(config.output,"wb")
+    def set_args(self, cfg):
+        # own file (not the module's outfile, other ida modes may print to it)
+        output=cfg.output
+        if output is None: # Force file, since it's binary
+            output="%s.%s" % (cfg.outbase, "pcap")
+        self.pcap=open(output,"wb")
 
     first=True
     def consume(self,q):
@@ -1064,7 +1057,7 @@ class ReassembleIDALAPPCAP(ReassembleIDALAP):
             #        guint32 network;        /* data link type */          1 (ethernet)
             #} pcap_hdr_t;
             pcap_hdr=struct.pack("<LHHlLLL",0xa1b2c3d4,0x2,0x4,0x0,0,0xffff,1)
-            outfile.write(pcap_hdr)
+            self.pcap.write(pcap_hdr)
             self.first=False
 
         # Filter non-GSM packets (see IDA-GSM.txt)
@@ -1090,7 +1083,7 @@ class ReassembleIDALAPPCAP(ReassembleIDALAP):
             eth=struct.pack("!BBBBBBBBBBBBH",0x10,0x22,0x33,0x44,0x55,0x66,0xaa,0xbb,0xcc,0xdd,0xee,0xff,0x800)+ip
 
         pcap=struct.pack("<IIII",int(time),int(1000000*(time%1)),len(eth),len(eth))+eth
-        outfile.write(pcap)
+        self.pcap.write(pcap)
 
 modes=[
 ["ida",        ReassembleIDA,  ],
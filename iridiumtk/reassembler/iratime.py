@@ -2,7 +2,6 @@
 # vim: set ts=4 sw=4 tw=0 et pm=:
 
 import sys
-import re
 import collections
 from util import dt
 
@@ -12,22 +11,17 @@ from ..config import config, outfile
 class ReassembleIRATime(Reassemble):
     """Check if there are IRA for the same beam quicker than 4.2 seconds"""
     def __init__(self):
-        pass
+        self.topic="IRA"
     def filter(self,line):
         q=super(ReassembleIRATime,self).filter(line)
         if q==None: return None
         if q.typ!="IRA:": return None
         q.enrich()
 
-        p=re.compile(r'sat:(\d+) beam:(\d+)')
-        m=p.match(q.data)
-        if(not m):
+        if not hasattr(q, "sat"):
             print("Couldn't parse IRA:",q.data, end=' ', file=sys.stderr)
             return None
 
-        q.sat=     int(m.group(1))
-        q.beam=    int(m.group(2))
-
         return q
 
     buf=collections.defaultdict(lambda:collections.defaultdict(int))
@@ -2,13 +2,13 @@
 # vim: set ts=4 sw=4 tw=0 et pm=:
 
 import sys
-import re
 
 from .base import *
 from ..config import config, outfile
 
 class InfoITLSatMap(Reassemble):
     def __init__(self):
+        self.topic=["IRA","ITL"]
         self.itl=None
         self.ira=None
         self.store= {}
@@ -18,28 +18,20 @@ class InfoITLSatMap(Reassemble):
         if q==None: return None
         if q.typ!="IRA:" and q.typ!="ITL:": return None
         if q.typ=="IRA:":
-            p=re.compile(r'sat:(\d+) beam:(\d+)')
-            m=p.search(q.data)
-            if(not m):
+            if not hasattr(q, "sat"):
                 print("Couldn't parse IRA: ",q.data, end=' ', file=sys.stderr)
                 return None
             else:
                 q.enrich(True)
-                q.sat=  int(m.group(1))
-                q.beam= int(m.group(2))
                 self.ira=q
         elif q.typ=="ITL:":
-            p=re.compile(r'V[12] OK(?:\[\d\])? P(\d+) (?:---|R\d\d|S(\d+)) ')
-            m=p.search(q.data)
-            if(not m):
+            if not hasattr(q, "plane"):
                 print("Couldn't parse ITL: ",q.data, end=' ', file=sys.stderr)
                 return None
-            elif m.group(2) is None:
+            elif not hasattr(q, "satno"):
                 return None
             else:
                 q.enrich(True)
-                q.plane= int(m.group(1))
-                q.satno= int(m.group(2))
                 self.itl=q
 
         if self.itl is None or self.ira is None:
@@ -3,7 +3,6 @@
 
 import sys
 import datetime
-import re
 import os
 from copy import deepcopy
 
@@ -27,7 +26,9 @@ class LiveMap(Reassemble):
             eol=curses_eol()
         pass
 
-    r2=re.compile(r' *sat:(\d+) beam:(\d+) (?:xyz=\S+ )?pos=.([+-][0-9.]+)\/([+-][0-9.]+). alt=(-?\d+).*')
+    def set_args(self, cfg):
+        global config
+        config=cfg
 
     def filter(self,line):
         q=super().filter(line)
@@ -43,14 +44,7 @@ class LiveMap(Reassemble):
         return q
 
     def process(self,q):
-        # Parse out IRA info
-        m=self.r2.match(q.data)
-        if not m: return None
-        q.sat=  int(m.group(1))
-        q.beam= int(m.group(2))
-        q.lat=float(m.group(3))
-        q.lon=float(m.group(4))
-        q.alt=  int(m.group(5))
+        if not hasattr(q, "sat"): return None
 
         rv=None
         maptime=q.time-(q.time%self.intvl)
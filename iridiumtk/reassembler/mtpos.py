@@ -33,14 +33,13 @@ class ReassembleIDAMap(ReassembleIDA):
             global eol
             eol = curses_eol()
 
-    def args(self, parser):
-        global config
-
+    def add_args(self, parser):
         parser.add_argument("--uplink", "--ul", action='store_true', help="do uplink positions instead")
         parser.add_argument("--heatmap", action='store_true', help="produce json for heatmap instead")
-        config = parser.parse_args()
 
-        return config
+    def set_args(self, cfg):
+        global config
+        config = cfg
 
 
     def consume(self, q):
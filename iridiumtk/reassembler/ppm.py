@@ -3,7 +3,6 @@
 
 import sys
 import datetime
-import re
 import struct
 import math
 import os
@@ -19,12 +18,10 @@ SECOND = np.timedelta64(1, 's')
 
 class ReassemblePPM(Reassemble):
     def __init__(self):
+        self.topic="IBC"
         self.idx=None
         pass
 
-    r1=re.compile(r'.* slot:(\d)')
-    r2=re.compile(r'.* time:([0-9:T-]+(?:\.\d+)?)Z')
-
     def filter(self,line):
         q=super().filter(line)
         if q==None: return None
@@ -36,13 +33,9 @@ class ReassemblePPM(Reassemble):
         if 'perfect' in config.args:
             if not q.perfect: return None
 
-        m=self.r1.match(q.data)
-        if not m: return
-        q.slot=int(m.group(1))
-
-        m=self.r2.match(q.data)
-        if not m: return
-        q.itime = np.datetime64(m.group(1))
+        if not hasattr(q, "slot"): return
+        if not hasattr(q, "iri_time_str"): return
+        q.itime = np.datetime64(q.iri_time_str[:-1])
         return q
 
     def process(self,q):
@@ -12,18 +12,20 @@ class StatsIRI(Reassemble):
     stats={}
 
     def __init__(self):
+        self.topic="IRI"
         for x in ['VO', 'TL', 'DA', 'BC', 'IP', 'MS', 'U3', 'U4', 'U5', 'U6']:
                 self.stats[x]=0
         pass
 
+    r1=re.compile(r'(?:^|.* )([A-Z0-9][A-Z0-9]) \[')
+
     def filter(self,line):
         q=super().filter(line)
 
         if q==None: return None
         if q.typ!="IRI:": return None
 
-        p=re.compile(r'(?:^|.* )([A-Z0-9][A-Z0-9]) \[')
-        m=p.match(q.data)
+        m=self.r1.match(q.data)
         if(not m):
             print("Couldn't parse IRI: ",q.data, file=sys.stderr)
             return None
@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 # vim: set ts=4 sw=4 tw=0 et pm=:
 
-import re
 from math import sqrt
 from types import SimpleNamespace
 from copy import deepcopy
@@ -142,16 +141,7 @@ class CalcTDOA(Reassemble):
         self.topic = ["IRA", "IBC"]
         pass
 
-    def args(self, parser):
-        global do_delta
-        global ref, drefalt
-        global gctrmod
-        global saveresult
-        global do_tof
-        global max_age, min_dist
-        global ppm, do_update_ppm, only_one
-        global good_gdop
-
+    def add_args(self, parser):
         parser.add_argument("-l", "--loc", choices=get_locations(), action=GetObserver, help="location")
         parser.add_argument("--reduce", type=int, metavar="NUM", help="only calulate ever n'th position")
         parser.add_argument("--save", action='store_true', help="keep old position for next iteration")
@@ -163,7 +153,16 @@ class CalcTDOA(Reassemble):
         parser.add_argument("--updateppm", action='store_true', help="try to estimate ppm (every 5m)")
         parser.add_argument("--onlyone", action='store_true', help="only keep one strike per sat")
         parser.add_argument("--help2", action="help")
-        config = parser.parse_args()
+
+    def set_args(self, config):
+        global do_delta
+        global ref, drefalt
+        global gctrmod
+        global saveresult
+        global do_tof
+        global max_age, min_dist
+        global ppm, do_update_ppm, only_one
+        global good_gdop
 
         if config.loc:
             do_delta = True
@@ -188,12 +187,6 @@ class CalcTDOA(Reassemble):
         if config.onlyone:
             only_one = True
         print("options:", "reduce:", gctrmod, "save:", saveresult, "tof:", do_tof, "strike_age:", max_age, "strike_dist:", min_dist, "ppm:", ppm, "update_ppm:", do_update_ppm, "only_one:", only_one, "gdop:", good_gdop)
-        return config
-
-    r1 = re.compile(r' sat:(\d+) cell:\d+ 0 slot:(\d)')
-    r2 = re.compile(r' time:([0-9:T-]+(?:\.\d+)?)Z')
-    r3 = re.compile(r'^sat:(\d+) beam:\d+ xyz=\(([+-]?[0-9]+),([+-]?[0-9]+),([+-]?[0-9]+)\) ')
-    r4 = re.compile(r' alt=(\d+) ')
 
     def filter(self, line):
         q = super().filter(line)
@@ -213,14 +206,9 @@ class CalcTDOA(Reassemble):
         global strikes
         if q.typ == "IBC:":
 
-            m = self.r1.search(q.data)
-            if not m: return
-            q.sat = int(m.group(1))
-            q.slot = int(m.group(2))
-
-            m = self.r2.search(q.data)
-            if not m: return
-            q.itime = np.datetime64(m.group(1))
+            if getattr(q, "sat", None) is None or q.unknown01 != 0: return
+            if not hasattr(q, "iri_time_str"): return
+            q.itime = np.datetime64(q.iri_time_str[:-1])
 
 #            print("i",m.group(1),q.itime)
 
@@ -250,11 +238,8 @@ class CalcTDOA(Reassemble):
         elif q.typ == "IRA:":
             if fileref != q.starttime: return # IBC first
 
-            m = self.r3.search(q.data)
-            if not m: return
-
-            q.sat = int(m.group(1))
-            q.xyz = np.array([int(m.group(2)), int(m.group(3)), int(m.group(4))])*4
+            if not hasattr(q, "xyz"): return
+            q.xyz = np.array(q.xyz)*4
             q.alt2 = sum([x*x for x in q.xyz])
             q.uxtime = npepoch(q.starttime, q.nstime)
             q.uxtime = ppmcorr(q.uxtime)
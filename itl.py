@@ -691,6 +691,10 @@ BIN_HDR=    [hex2bin(x) for x in PRS_HDR]
 BIN_PLANES= [hex2bin(x) for x in PRS_PLANES]
 BIN_PRS=    [hex2bin(x) for x in PRS_LIST]
 
+INT_HDR=    [int(x,16) for x in PRS_HDR]
+INT_PLANES= [int(x,16) for x in PRS_PLANES]
+INT_PRS=    [int(x,16) for x in PRS_LIST]
+
 def map_sat(num, version):
     if version==2:
         if num==77:
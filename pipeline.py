@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim: set ts=4 sw=4 tw=0 et pm=:
+
+"""
+Parse RAW lines for reassembler modes in the same process
+
+    reassembler.py -m idapp -i output.bits
+
+gives the same results as
+
+    iridium-parser.py output.bits | reassembler.py -m idapp
+
+without the second process: frames are handed to the mode as objects with
+the fields of their framepack record (see ParsedObject), so they are
+neither formatted as text nor parsed again unless the mode uses the text.
+Frames with errors are passed on as the text lines iridium-parser.py
+prints for them.
+"""
+
+import os
+import sys
+
+import bitsparser
+import bitspack
+import timeindex
+from readahead import compressed
+
+def is_raw(filename):
+    """Is filename iridium-extractor output (.bits or .pbits)"""
+    base, ext = os.path.splitext(filename)
+    if ext in compressed:
+        ext = os.path.splitext(base)[1]
+    return ext in ('.bits', '.pbits')
+
+def open_raw(filename, start=None, end=None, use_index=None):
+    """RAW lines of filename ('-' for stdin), see timeindex.open_lines()"""
+    if filename == '-':
+        return sys.stdin
+    if bitspack.is_packed(filename):
+        return bitspack.Reader(filename)
+    return timeindex.open_lines(filename, bitsparser.raw_globalns, start, end, use_index)
+
+def frames(lines, parser, start=None, end=None):
+    """Parse lines with parser (a bitsparser.Parser), yields ParsedObjects
+    and text lines (of frames with errors) for Reassemble.run().
+
+    Like iridium-parser.py, only frames within [start, end) are kept and
+    frames with errors or corrected bits are dropped with --perfect."""
+    # not at the top, the reassembler modules need their config when imported
+    from iridiumtk.reassembler.base import ParsedObject
+    perfect=parser.args.perfect
+    timebounds=start is not None or end is not None
+    for lineno, line in enumerate(lines, 1):
+        if isinstance(line, str): # records from packed files are already split
+            line=line.strip()
+        q=bitsparser.Message(line, lineno, parser)
+        if timebounds and (q.parse_error or not timeindex.in_range(q.globalns, start, end)):
+            continue
+        q=q.upgrade()
+        if q.error:
+            if not perfect:
+                yield q.pretty()+" ERR:"+", ".join(q.error_msg)+"\n"
+            continue
+        if perfect:
+            if "fixederrs" in q.__dict__ and q.fixederrs>0:
+                continue
+            q.descramble_extra=""
+        yield ParsedObject(q)
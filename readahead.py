@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim: set ts=4 sw=4 tw=0 et pm=:
+
+"""
+Open (compressed) input files
+
+Compressed text files are decompressed by a background thread which hands
+batches of lines to the reader through a bounded queue. The decompressors
+release the GIL, so this overlaps with parsing on the main thread.
+
+Uncompressed files are read through mmap, in blocks of whole lines.
+"""
+
+import os
+import sys
+import io
+import mmap
+import stat
+import codecs
+import threading
+import queue
+
+compressed=('.xz', '.bz2', '.gz', '.zst')
+
+def zstd_open(filename, mode):
+    try:
+        from compression import zstd # python 3.14+
+        return zstd.open(filename, mode)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("reading .zst files requires the zstandard module") from None
+    return zstandard.open(filename, mode)
+
+def open_file(filename, mode):
+    """Open filename, decompressing based on the extension"""
+    ext = os.path.splitext(filename)[1]
+    if ext == '.gz':
+        import gzip
+        return gzip.open(filename, mode)
+    elif ext == '.bz2':
+        import bz2
+        return bz2.open(filename, mode)
+    elif ext == '.xz':
+        import lzma
+        return lzma.open(filename, mode)
+    elif ext == '.zst':
+        return zstd_open(filename, mode)
+    else:
+        return open(filename, mode)
+
+class ReadAhead(object):
+    """Text lines of a binary file object, read by a background thread.
+
+    At most depth batches of about blocksize bytes are buffered.
+    """
+    def __init__(self, file, blocksize=1<<20, depth=8, encoding='utf-8'):
+        self.file=file
+        self.blocksize=blocksize
+        self.encoding=encoding
+        self.queue=queue.Queue(maxsize=depth)
+        self.stopped=threading.Event()
+        self.lines=iter(())
+        self.thread=threading.Thread(target=self.reader, daemon=True, name='readahead')
+        self.thread.start()
+
+    def reader(self):
+        decoder=codecs.getincrementaldecoder(self.encoding)()
+        rest=""
+        try:
+            while not self.stopped.is_set():
+                data=self.file.read(self.blocksize)
+                text=rest+decoder.decode(data, final=not data)
+                lines=io.StringIO(text).readlines()
+                if data and lines and not lines[-1].endswith("\n"):
+                    rest=lines.pop()
+                else:
+                    rest=""
+                if lines:
+                    self.put(lines)
+                if not data:
+                    break
+        except Exception as e:
+            self.put(e)
+        self.put(None)
+
+    def put(self, item):
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while True:
+            line=next(self.lines, None)
+            if line is not None:
+                return line
+            batch=self.queue.get()
+            if batch is None:
+                self.queue.put(None) # stay at EOF
+                raise StopIteration
+            if isinstance(batch, Exception):
+                raise batch
+            self.lines=iter(batch)
+
+    def readline(self):
+        try:
+            return next(self)
+        except StopIteration:
+            return ""
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.stopped.set()
+        self.thread.join()
+        self.file.close()
+
+class MappedLines(object):
+    """Text lines of an uncompressed file, read through mmap.
+
+    With start/stop only the lines starting within [start, stop) are read,
+    so adjacent ranges split a file without losing or duplicating lines.
+
+    If set, blockhook(offset, lines) is called for each block of lines read,
+    and with lines=None and the end offset once the range is done.
+    """
+    def __init__(self, filename, start=0, stop=None, blocksize=1<<20, encoding='utf-8'):
+        self.file=open(filename, 'rb')
+        st=os.fstat(self.file.fileno())
+        if not stat.S_ISREG(st.st_mode):
+            self.file.close()
+            raise ValueError("%s: can only map regular files"%filename)
+        size=st.st_size
+        if stop is None or stop>size:
+            stop=size
+        self.mm=None
+        if size>0:
+            self.mm=mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            if 0<start<size and self.mm[start-1]!=ord("\n"):
+                start=self.mm.find(b"\n", start)+1 or size
+        self.start=min(start, stop)
+        self.stop=stop
+        self.pos=self.start
+        self.blocksize=blocksize
+        self.encoding=encoding
+        self.blockhook=None
+        self.lines=self.read_lines()
+
+    def read_lines(self):
+        mm=self.mm
+        while self.pos<self.stop:
+            end=mm.find(b"\n", min(self.pos+self.blocksize, self.stop)-1)+1 or len(mm)
+            lines=io.StringIO(mm[self.pos:end].decode(self.encoding)).readlines()
+            if self.blockhook is not None:
+                self.blockhook(self.pos, lines)
+            self.pos=end
+            yield from lines
+        if self.blockhook is not None:
+            self.blockhook(self.pos, None)
+
+    def __iter__(self):
+        return self.lines
+
+    def __next__(self):
+        return next(self.lines)
+
+    def readline(self):
+        return next(self.lines, "")
+
+    def tell(self):
+        return self.pos
+
+    def progress(self):
+        """(bytes read, bytes total) of the range"""
+        return (min(self.pos, self.stop)-self.start, self.stop-self.start)
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.lines.close()
+        if self.mm is not None:
+            self.mm.close()
+        self.file.close()
+
+def open_lines(filename, start=0, stop=None):
+    """Open a text file for reading lines.
+
+    Compressed files are read ahead in a background thread, regular files
+    are mapped (and can be limited to the byte range [start, stop)).
+    '-' is stdin.
+    """
+    ranged=start>0 or stop is not None
+    if filename == '-':
+        if ranged:
+            raise ValueError("byte ranges need an input file")
+        return sys.stdin
+    if os.path.splitext(filename)[1] in compressed:
+        if ranged:
+            raise ValueError("%s: byte ranges need an uncompressed file"%filename)
+        return ReadAhead(open_file(filename, 'rb'))
+    try:
+        return MappedLines(filename, start, stop)
+    except (ValueError, OSError):
+        if ranged:
+            raise
+    return open(filename, 'rt')
@@ -2,7 +2,6 @@
 # vim: set ts=4 sw=4 tw=0 et pm=:
 
 import sys
-import fileinput
 import argparse
 import os
 from os.path import splitext, basename
@@ -11,8 +10,13 @@ import pkgutil
 
 import iridiumtk.config
 import iridiumtk.reassembler
+import timeindex
+import framepack
+import pipeline
+import bitsparser
 
-parser = argparse.ArgumentParser()
+# modes used together may add the same option, the last one is kept
+parser = argparse.ArgumentParser(conflict_handler='resolve')
 
 def parse_comma(arg):
     return arg.split(',')
@@ -35,6 +39,25 @@ parser.add_argument("-d", "--debug",       action="store_true",
 parser.add_argument("--station",           default=None,
         help="optional station ID for acars")
 
+parser.add_argument("--start",             default=None, type=timeindex.parse_time,
+        help="skip lines before this time (unix time or ISO 8601)")
+parser.add_argument("--end",               default=None, type=timeindex.parse_time,
+        help="skip lines at or after this time (unix time or ISO 8601)")
+parser.add_argument("--index",             action="store_true", dest="use_index", default=None,
+        help="always use/build a time index (FILE.idx) of the input file (default: with --start/--end)")
+parser.add_argument("--no-index",          action="store_false", dest="use_index", default=None,
+        help="don't use/build a time index (FILE.idx) of the input file")
+parser.add_argument("--frames",            action="store_true",
+        help="input is binary records (iridium-parser -o frames/--zmq-frames), default for FILE.frames")
+parser.add_argument("--raw",               action="store_true",
+        help="input is iridium-extractor output, parsed in this process, default for FILE.bits/.pbits")
+parser.add_argument("--perfect",           action="store_true",
+        help="with RAW input: only use frames without errors (as iridium-parser -p)")
+parser.add_argument("--harder",            action="store_true",
+        help="with RAW input: try harder to parse input (as iridium-parser --harder)")
+parser.add_argument("--uw-ec",             action="store_true", dest='uwec',
+        help="with RAW input: enable error correction on unique word (as iridium-parser --uw-ec)")
+
 parser.add_argument("remainder", nargs='*',
         help=argparse.SUPPRESS)
 
@@ -82,22 +105,26 @@ if config.debug or config.mode == 'help':
             print()
     print()
 
-if config.mode not in modes:
-    raise SystemExit("No plugin found for mode: "+config.mode)
+modenames=config.mode.split(',')
+for mode in modenames:
+    if mode not in modes:
+        raise SystemExit("No plugin found for mode: "+mode)
 
-zx=modes[config.mode][1]()
+zxs=[modes[mode][1]() for mode in modenames]
 
-if len(modes[config.mode])>2:
-    validargs=modes[config.mode][2]
+validargs=[modes[mode][2] for mode in modenames if len(modes[mode])>2]
 
 for x in config.args:
-    if x not in validargs:
+    if not any(x in v for v in validargs):
         raise Exception("unknown -a option: "+x)
 
-if getattr(zx, "args", None) is not None:
-    config = zx.args(parser)
-else:
-    config = parser.parse_args()
+# options of the modes, once per mode class
+added=[]
+for zx in zxs:
+    if getattr(zx, "add_args", None) is not None and type(zx) not in added:
+        zx.add_args(parser)
+        added.append(type(zx))
+config = parser.parse_args()
 
 if config.input is None:
     if not config.remainder:
@@ -109,38 +136,97 @@ config.outbase, _= splitext(config.input)
 if config.outbase.startswith('/dev'):
     config.outbase=basename(config.outbase)
 
-if config.output is None:
-    outfile=sys.stdout
+# INPUT.mode output files need a named input file
+named_input=not (config.input.startswith("zmq:") or config.input == "-" or config.input.startswith("/dev/"))
+
+if len(zxs)>1:
+    # one output file per mode: OUTPUT.mode, default INPUT.mode
+    if config.output is None or config.output == "" or config.output == "=":
+        if not named_input:
+            parser.error("several modes need -o OUTPUT (for OUTPUT.mode files) with input from stdin or zmq")
+        outbase=config.outbase
+    else:
+        outbase=config.output
+    outputs=["%s.%s" % (outbase, mode) for mode in modenames]
+    outfiles=[open(output,"w") for output in outputs]
+elif config.output is None:
+    outfiles=[sys.stdout]
 elif config.output == "" or config.output == "=":
+    if config.input.startswith("zmq:") or config.input == "-":
+        parser.error("-o = needs an input file name")
     config.output="%s.%s" % (config.outbase, config.mode)
-    outfile=open(config.output,"w")
+    outfiles=[open(config.output,"w")]
 else:
-    outfile=open(config.output,"w")
-
-config.outfile = outfile
-
-if getattr(zx, "outfile", None) is not None:
-    zx.outfile=config.outfile
-if getattr(zx, "config", None) is not None:
-    zx.config=config
+    outfiles=[open(config.output,"w")]
+
+config.outfile = outfiles[0]
+
+# each mode gets its own output, also modes which write files themselves
+# (live-map, lap, ...) instead of printing to config.outfile
+configs=[config]
+if len(zxs)>1:
+    configs=[argparse.Namespace(**vars(config)) for _ in zxs]
+    for mconfig, output, outfile in zip(configs, outputs, outfiles):
+        (mconfig.output, mconfig.outfile)=(output, outfile)
+
+for zx, outfile, mconfig in zip(zxs, outfiles, configs):
+    if getattr(zx, "set_args", None) is not None:
+        zx.set_args(mconfig)
+    if getattr(zx, "outfile", None) is not None:
+        zx.outfile=outfile
+    if getattr(zx, "config", None) is not None:
+        zx.config=mconfig
+
+if len(zxs)>1:
+    zx=iridiumtk.reassembler.base.MultiMode(list(zip(zxs, outfiles)))
+else:
+    zx=zxs[0]
 
 if config.input.startswith("zmq:"):
-    try:
-        topics=zx.topic
-        if not isinstance(topics,list):
-            topics=[topics]
-    except AttributeError:
-        print("mode '%s' does not support streaming"%mode, file=sys.stderr)
-        sys.exit(1)
+    topics=[]
+    for mode, mzx in zip(modenames, zxs):
+        try:
+            mtopics=mzx.topic
+        except AttributeError:
+            print("mode '%s' does not support streaming"%mode, file=sys.stderr)
+            sys.exit(1)
+        if not isinstance(mtopics,list):
+            mtopics=[mtopics]
+        topics+=[t for t in mtopics if t not in topics]
     import zmq
     context = zmq.Context()
     socket = context.socket(zmq.SUB)
-    socket.connect ("tcp://localhost:4223")
+    socket.connect (config.input[4:] or "tcp://localhost:4223")
     for topic in topics:
         socket.setsockopt(zmq.SUBSCRIBE, bytes(topic,"ascii"))
-    config.iobj=iter(socket.recv_string,"")
+    # iridium-parser --zmq-join sends several lines per message
+    if config.frames:
+        config.iobj=(rec for msg in iter(socket.recv,b"") for rec in framepack.split(msg))
+    else:
+        config.iobj=(line for msg in iter(socket.recv_string,"") for line in msg.split("\n"))
+elif config.raw or pipeline.is_raw(config.input):
+    # iridium-parser in this process, handles --start/--end itself
+    config.raw=True
+    rawparser=bitsparser.Parser(perfect=config.perfect, harder=config.harder, uwec=config.uwec)
+    config.iobj=pipeline.frames(pipeline.open_raw(config.input, config.start, config.end, config.use_index),
+                                rawparser, config.start, config.end)
+elif config.frames or framepack.is_frames(config.input):
+    config.frames=True
+    config.iobj=framepack.Reader(config.input)
+elif config.input == "-":
+    config.iobj=sys.stdin
 else:
-    config.iobj=fileinput.input(config.input)
+    # skips to --start/--end if the file has an index
+    config.iobj=timeindex.open_lines(config.input, timeindex.parsed_globalns, config.start, config.end, config.use_index)
+
+if (config.start is not None or config.end is not None) and not config.raw:
+    timefn=framepack.globalns if config.frames else timeindex.parsed_globalns
+    config.iobj=timeindex.time_filter(config.iobj, timefn, config.start, config.end)
+
+# skip lines of other types before they are split (RAW input yields objects)
+types=zx.types()
+if types is not None and not config.raw:
+    config.iobj=zx.skip_types(config.iobj, types)
 
 try:
     zx.run(config.iobj)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim: set ts=4 sw=4 tw=0 et pm=:
+
+"""
+Benchmark bitsparser.split_raw() against the Message.p regex (match_raw)
+
+    bench_split_raw.py file.bits [...]
+    pypy3 bench_split_raw.py file.bits [...]
+
+parse_raw() uses split_raw() (with the regex as fallback) on PyPy and
+the regex on CPython, rerun this after changing either.
+"""
+
+import os
+import sys
+import time
+import platform
+import fileinput
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bitsparser
+
+def bench(fn, lines, repeat=5):
+    best=None
+    for _ in range(repeat):
+        t0=time.perf_counter()
+        for line in lines:
+            fn(line)
+        t=time.perf_counter()-t0
+        best=t if best is None else min(best, t)
+    return best
+
+if __name__ == "__main__":
+    lines=[line.strip() for line in fileinput.input()]
+    n=max(len(lines), 1)
+    fallback=sum(bitsparser.split_raw(line) is None for line in lines)
+
+    print("%s %s, parse_raw uses %s"%(platform.python_implementation(), platform.python_version(),
+          "match_raw" if bitsparser.parse_raw is bitsparser.match_raw else "split_raw"))
+    print("lines:      %d (%d regex fallbacks)"%(len(lines), fallback))
+    for (name, fn) in (("regex", bitsparser.match_raw),
+                       ("split_raw", lambda line: bitsparser.split_raw(line) or bitsparser.match_raw(line))):
+        t=bench(fn, lines)
+        print("%-11s %.3fs %.2fus/line"%(name+":", t, t*1e6/n))
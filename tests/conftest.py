@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import pytest
+
+SAMPLE=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "sample.bits")
+
+@pytest.fixture(scope="module")
+def longfile(tmp_path_factory):
+    """The sample repeated 40 times (several MB) with increasing timestamps"""
+    with open(SAMPLE) as f:
+        lines=f.read().splitlines()
+    path=tmp_path_factory.mktemp("long")/"long.bits"
+    with open(path, "w") as f:
+        for copy in range(40):
+            for line in lines:
+                fields=line.split(" ", 3)
+                if fields[1].startswith("i-"):
+                    fields[2]="%012.4f"%(float(fields[2])+copy*20000)
+                print(" ".join(fields), file=f)
+    return path
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import random
+import pytest
+
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import bch
+
+def test_tdivide():
+    rnd=random.Random(1)
+    for poly in bch.divtabs:
+        nums=[0, 1, poly, poly<<3, 0xffffffff, 1<<31, 1<<32, (1<<40)-1]
+        for length in range(1, 41):
+            nums+=[rnd.getrandbits(length) for _ in range(50)]
+        for num in nums:
+            assert bch.tdivide(poly, num) == bch.nndivide(poly, num), (poly, num)
+
+def brute_force(monkeypatch, poly, bits, maxerrs):
+    # without synlimits nrepair1/nrepair2 search all bit flips
+    with monkeypatch.context() as m:
+        m.delitem(bch.synlimits, poly)
+        if maxerrs == 1:
+            return bch.nrepair1(poly, bits)
+        return bch.nrepair2(poly, bits)
+
+def test_synrepair(monkeypatch):
+    rnd=random.Random(2)
+    for (poly, (length, maxerrs)) in list(bch.synlimits.items()):
+        for blen in range(poly.bit_length(), length+1):
+            words=[rnd.getrandbits(blen) for _ in range(60)]
+            # valid code words with up to maxerrs+1 flipped bits
+            for _ in range(60):
+                word=rnd.getrandbits(blen)
+                word^=bch.nndivide(poly, word)
+                for _ in range(rnd.randint(0, maxerrs+1)):
+                    word^=1<<rnd.randrange(blen)
+                words.append(word)
+            for word in words:
+                bits=format(word, "0%db"%blen)
+                expected=brute_force(monkeypatch, poly, bits, maxerrs)
+                assert bch.synrepair(poly, bits, maxerrs) == expected, (poly, bits)
+                if maxerrs == 2:
+                    assert bch.synrepair(poly, bits, 1) == brute_force(monkeypatch, poly, bits, 1), (poly, bits)
+
+def test_mk_syn_collision(monkeypatch):
+    for name in ("syndromes", "synlimits", "divtabs"):
+        monkeypatch.setattr(bch, name, dict(getattr(bch, name)))
+    bch.mk_syn(poly=7, bits=3, synbits=2) # x^2+x+1 has period 3
+    with pytest.raises(AssertionError, match="collision"):
+        bch.mk_syn(poly=7, bits=4, synbits=2)
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import pytest
+
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from util import Bits
+
+BITS="0110100111000101"
+
+def test_bits_str_semantics():
+    b=Bits.fromstr(BITS)
+    assert len(b) == len(BITS)
+    assert str(b) == BITS
+    assert [b[i] for i in range(len(BITS))] == list(BITS)
+    assert b[-1] == BITS[-1]
+    assert b[3:11] == BITS[3:11]
+    assert isinstance(b[3:11], Bits)
+    assert b[::2] == BITS[::2]
+    assert b[9:4] == ""
+    assert b+"101" == BITS+"101"
+    with pytest.raises(IndexError):
+        b[len(BITS)]
+
+def test_bits_fields():
+    b=Bits.fromstr(BITS)
+    assert b.uint(3, 11) == int(BITS[3:11], 2)
+    assert b.uint(13, 14) == int(BITS[13])
+    assert b.uint(10, 99) == int(BITS[10:], 2)
+    assert b.bin(2, 7) == BITS[2:7]
+    (blocks, rest)=b.split(5)
+    assert [str(x) for x in blocks] == [BITS[0:5], BITS[5:10], BITS[10:15]]
+    assert rest == BITS[15:]
+    assert Bits.fromstr("") == "" and len(Bits()) == 0
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import subprocess
+
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PARSER=os.path.join(ROOT, "iridium-parser.py")
+SAMPLE=os.path.join(ROOT, "tests", "data", "sample.bits")
+
+def parse(*args, cwd=None, check=True):
+    """stdout of iridium-parser.py -o line with args"""
+    return subprocess.run([sys.executable, PARSER, "-o", "line"]+list(args), stdout=subprocess.PIPE,
+                          stderr=subprocess.DEVNULL, check=check, cwd=cwd).stdout
+
+STOPPER="""
+import os, sys, runpy
+sys.argv=sys.argv[1:]
+sys.path.insert(0, os.path.dirname(sys.argv[0]))
+import checkpoint
+block=checkpoint.Checkpoint.block
+def stop_second(self, offset, lines):
+    if lines is not None:
+        self.blocks_seen=getattr(self, 'blocks_seen', 0)+1
+        if self.blocks_seen == 2:
+            self.stop()
+    block(self, offset, lines)
+checkpoint.Checkpoint.block=stop_second
+runpy.run_path(sys.argv[0], run_name='__main__')
+"""
+
+def test_checkpoint_resume(longfile, tmp_path):
+    expected=parse(str(longfile))
+    ckpt=str(tmp_path/"run.ckpt")
+    args=[PARSER, "-o", "file", "--checkpoint", ckpt, str(longfile)]
+    stopped=subprocess.run([sys.executable, "-c", STOPPER]+args, stderr=subprocess.DEVNULL, cwd=tmp_path)
+    assert stopped.returncode == 1
+    assert os.path.exists(ckpt)
+    output=(tmp_path/"long.parsed").read_bytes()
+    assert output and len(output) < len(expected)
+    resumed=subprocess.run([sys.executable]+args, stderr=subprocess.PIPE, check=True, cwd=tmp_path)
+    assert b"Resuming at line" in resumed.stderr
+    assert not os.path.exists(ckpt)
+    assert (tmp_path/"long.parsed").read_bytes() == expected
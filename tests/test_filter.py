@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import sys
+import shutil
+import subprocess
+import pytest
+
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PARSER=os.path.join(ROOT, "iridium-parser.py")
+SAMPLE=os.path.join(ROOT, "tests", "data", "sample.bits")
+
+def parse(*args):
+    return subprocess.run([sys.executable, PARSER, "-o", "line"]+list(args)+[SAMPLE],
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+# "q.attr <op> literal" takes the fast path, wrapped in () it is eval()ed
+@pytest.mark.parametrize("check", [
+    "q.ra_sat==30", "q.ra_sat!=30", "q.ra_sat<60", "q.ra_sat<=30",
+    "q.ra_sat>100", "q.ra_sat >= 100", "q.uplink == False",
+])
+def test_fast_check_matches_eval(check):
+    fast=parse("--filter=IridiumRAMessage,"+check)
+    slow=parse("--filter=IridiumRAMessage,(%s)"%check)
+    assert fast.returncode == slow.returncode == 0
+    assert fast.stdout == slow.stdout
+    assert fast.stdout
+
+def test_eval_check():
+    out=parse("--filter=IridiumRAMessage,q.ra_sat//10 == 3").stdout.decode().splitlines()
+    assert out
+    assert all(re.search(r" sat:03\d ", line) for line in out)
+
+def test_unknown_class():
+    res=parse("--filter=IridiumNoSuchMessage")
+    assert res.returncode == 2
+    assert b"unknown message class 'IridiumNoSuchMessage'" in res.stderr
+    assert not res.stdout
+
+def test_invalid_check():
+    res=parse("--filter=IridiumRAMessage,q.ra_sat==")
+    assert res.returncode == 2
+    assert b"invalid check 'q.ra_sat=='" in res.stderr
+    assert not res.stdout
+
+@pytest.mark.skipif(shutil.which("perl") is None, reason="needs perl")
+def test_mkmodule_output_compiles():
+    # the Makefile builds parser.py for test_parser.py with mkmodule.pl
+    src=subprocess.run(["perl", os.path.join(ROOT, "tests", "mkmodule.pl"), PARSER],
+                       stdout=subprocess.PIPE, check=True).stdout
+    compile(src, "parser.py", "exec")
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import subprocess
+
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import framepack
+
+PARSER=os.path.join(ROOT, "iridium-parser.py")
+SAMPLE=os.path.join(ROOT, "tests", "data", "sample.bits")
+
+def run(*args, cwd=None):
+    return subprocess.run([sys.executable]+list(args), stdout=subprocess.PIPE,
+                          stderr=subprocess.DEVNULL, check=True, cwd=cwd).stdout
+
+def test_frames_records(tmp_path):
+    frames=str(tmp_path/"sample.frames")
+    with open(frames, "wb") as f:
+        f.write(run(PARSER, "-o", "frames", SAMPLE))
+    records=list(framepack.Reader(frames))
+    assert {rec[:4] for rec in records} >= {b"IRA:", b"IBC:", b"IDA:"}
+    for rec in records:
+        frame=framepack.unpack(rec)
+        assert frame.typ == rec[:4].decode()
+    # the text lines are those of -o line (without error frames)
+    lines=run(PARSER, "-o", "line", "--errorfree", SAMPLE)
+    assert run(os.path.join(ROOT, "framepack.py"), frames) == lines
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import pytest
+
+np = pytest.importorskip("numpy")
+
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import bitsparser
+
+def rows(frames):
+    return ["".join(map(str, row)) for row in frames]
+
+@pytest.mark.parametrize("length", [2, 32, 64, 124, 128, 190, 312])
+def test_de_interleave_array(length):
+    frames=np.random.default_rng(length).integers(0, 2, (20, length), dtype=np.uint8)
+    parts=bitsparser.de_interleave_array(frames)
+    for (frame, bits) in enumerate(rows(frames)):
+        assert tuple(rows(part)[frame] for part in parts) == bitsparser.de_interleave(bits)
+
+@pytest.mark.parametrize("length", [6, 96, 126, 432])
+def test_de_interleave3_array(length):
+    frames=np.random.default_rng(length).integers(0, 2, (20, length), dtype=np.uint8)
+    parts=bitsparser.de_interleave_array(frames, 3)
+    for (frame, bits) in enumerate(rows(frames)):
+        assert tuple(rows(part)[frame] for part in parts) == bitsparser.de_interleave3(bits)
+
+def test_de_interleave_lcw_array():
+    frames=np.random.default_rng(46).integers(0, 2, (20, 46), dtype=np.uint8)
+    parts=bitsparser.de_interleave_lcw_array(frames)
+    for (frame, bits) in enumerate(rows(frames)):
+        assert tuple(rows(part)[frame] for part in parts) == bitsparser.de_interleave_lcw(bits)
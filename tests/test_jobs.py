@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import subprocess
+
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import bitsparser
+
+PARSER=os.path.join(ROOT, "iridium-parser.py")
+SAMPLE=os.path.join(ROOT, "tests", "data", "sample.bits")
+
+def parse(*args):
+    """stdout of iridium-parser.py -o line with args"""
+    return subprocess.run([sys.executable, PARSER, "-o", "line"]+list(args), stdout=subprocess.PIPE,
+                          stderr=subprocess.DEVNULL, check=True).stdout
+
+def untimed_lines():
+    """The sample with a file name without start time, plus lines the parser rejects"""
+    with open(SAMPLE) as f:
+        lines=[line.replace("i-1598047209-t1", "untimed") for line in f]
+    lines.insert(3, "RAW: untimed 99999999.0 no frame\n")
+    lines.append("RAW: untimed 1.0\n")
+    return lines
+
+def test_jobs_parity():
+    expected=parse(SAMPLE)
+    assert expected
+    assert parse("--jobs", "2", "--chunksize", "50", SAMPLE) == expected
+
+def test_jobs_parity_untimed(tmp_path):
+    path=tmp_path/"untimed.bits"
+    path.write_text("".join(untimed_lines()))
+    expected=parse(str(path))
+    assert expected
+    assert parse("--jobs", "3", "--chunksize", "7", str(path)) == expected
+
+def test_track_time_skips_garbage():
+    lines=untimed_lines()
+    parsed=bitsparser.Parser()
+    parsed.parse_many(lines)
+    tracked=bitsparser.Parser()
+    tracked.track_time(lines)
+    assert (tracked.tsoffset, tracked.maxts) == (parsed.tsoffset, parsed.maxts)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import random
+import subprocess
+
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import bitsparser
+import framemerge
+
+PARSER=os.path.join(ROOT, "iridium-parser.py")
+SAMPLE=os.path.join(ROOT, "tests", "data", "sample.bits")
+
+LONG="0011000000110000111100110001000010011111100110000101100101011101"*2
+SHORT="00110000001100001111001100010000"
+
+def raw(ms, bits, frequency=1626000000, confidence=80, name="i-1598047209-t1"):
+    return "RAW: %s %012.4f %d A:OK I:00000000000 %3d%% 0.50589 179 %s"%(name, ms, frequency, confidence, bits)
+
+def dedup(*inputs, **opts):
+    merger=framemerge.Dedup(**opts)
+    return (list(merger.frames(framemerge.merge(inputs))), merger.dropped)
+
+def test_merge_order():
+    rnd=random.Random(1)
+    inputs=[sorted(rnd.uniform(0, 1000) for _ in range(50)) for _ in range(4)]
+    inputs=[[raw(ms, LONG, name="i-1598047209-%s1"%"vbsr"[rx]) for ms in times] for (rx, times) in enumerate(inputs)]
+    inputs[2].insert(10, "garbage line")
+    merged=list(framemerge.merge(inputs))
+    assert sorted(line for (_, line) in merged) == sorted(sum(inputs, []))
+    times=[ns for (ns, _) in merged]
+    assert times == sorted(times)
+    # unparseable lines get the time of the line before
+    assert dict((line, ns) for (ns, line) in merged)["garbage line"] == bitsparser.raw_globalns(inputs[2][9])
+
+def test_best_confidence():
+    for confidences in ((70, 90), (90, 70)):
+        (a, b)=(raw(100, LONG, confidence=confidences[0]), raw(101, LONG, confidence=confidences[1], name="i-1598047209-r1"))
+        (out, dropped)=dedup([a], [b])
+        assert out == [a if confidences[0]>confidences[1] else b]
+        assert dropped == 1
+
+def test_prefix():
+    (a, b)=(raw(100, LONG), raw(100.5, LONG+"0110", name="i-1598047209-r1"))
+    assert dedup([a], [b]) == ([b], 1)
+    assert dedup([b], [a]) == ([b], 1)
+    # same length, different bits
+    c=raw(100.5, LONG[:-1]+"0", name="i-1598047209-r1")
+    assert dedup([a], [c]) == ([a, c], 0)
+
+def test_window():
+    a=raw(100, LONG)
+    at=lambda ms, **kw: raw(ms, LONG, name="i-1598047209-r1", **kw)
+    assert dedup([a], [at(105)]) == ([a], 1)
+    assert dedup([a], [at(105.0001)]) == ([a, at(105.0001)], 0)
+    assert dedup([a], [at(104, frequency=1626020000)]) == ([a], 1)
+    assert dedup([a], [at(104, frequency=1626020001)]) == ([a, at(104, frequency=1626020001)], 0)
+    # a later frame in between doesn't flush the first one too early
+    assert dedup([a, raw(103, "1"+LONG)], [at(105)]) == ([a, raw(103, "1"+LONG)], 1)
+
+def test_short_frames():
+    (a, b)=(raw(100, SHORT), raw(101, SHORT, confidence=90, name="i-1598047209-r1"))
+    assert dedup([a], [b]) == ([b], 1)
+    # no prefix matching below min_bits
+    c=raw(101, SHORT+"0", name="i-1598047209-r1")
+    assert dedup([a], [c]) == ([a, c], 0)
+    assert dedup([raw(100, LONG)], [raw(101, LONG[:32], name="i-1598047209-r1")])[1] == 0
+    assert dedup([a], [raw(106, SHORT, name="i-1598047209-r1")])[1] == 0
+
+def test_unparsed_lines():
+    a=raw(100, LONG)
+    (out, dropped)=dedup([a, "garbage line"], [a, "garbage line"])
+    assert (out, dropped) == ([a, "garbage line"], 2)
+    assert dedup([a, "garbage line"], [a, "other garbage"])[1] == 1
+
+def test_sample_twice():
+    with open(SAMPLE) as f:
+        lines=f.read().splitlines()
+    # the sample has some bursts decoded twice, too
+    (once, dropped)=dedup(lines)
+    assert 0 < dropped < 20
+    assert dedup(lines, lines) == (once, dropped+len(lines))
+    out=subprocess.run([sys.executable, PARSER, "-o", "line", "--merge", SAMPLE, SAMPLE],
+                       stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True).stdout
+    assert out == subprocess.run([sys.executable, PARSER, "-o", "line", "--merge", SAMPLE],
+                                 stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True).stdout
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import subprocess
+
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import bitspack
+
+PARSER=os.path.join(ROOT, "iridium-parser.py")
+SAMPLE=os.path.join(ROOT, "tests", "data", "sample.bits")
+
+def run(*args, cwd=None):
+    return subprocess.run([sys.executable]+list(args), stdout=subprocess.PIPE,
+                          stderr=subprocess.DEVNULL, check=True, cwd=cwd).stdout
+
+def test_pbits_round_trip(tmp_path):
+    with open(SAMPLE) as f:
+        lines=f.read().splitlines()
+    # L: ids can't be stored in frame records
+    lines.append(lines[0].replace(" I:", " L:"))
+    src=tmp_path/"in.bits"
+    src.write_text("\n".join(lines)+"\n")
+    packed=str(tmp_path/"in.pbits")
+    run(os.path.join(ROOT, "bitspack.py"), str(src), packed)
+    with bitspack.Reader(packed) as reader:
+        records=list(reader)
+    assert sum(isinstance(rec, tuple) for rec in records) > 100
+    back=run(os.path.join(ROOT, "bitspack.py"), "-d", packed, "-").decode().splitlines()
+    assert len(back) == len(lines)
+    assert back[-1] == lines[-1]
+    assert run(PARSER, "-o", "line", packed) == run(PARSER, "-o", "line", str(src))
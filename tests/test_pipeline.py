@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import subprocess
+import pytest
+
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PARSER=os.path.join(ROOT, "iridium-parser.py")
+REASSEMBLER=os.path.join(ROOT, "reassembler.py")
+SAMPLE=os.path.join(ROOT, "tests", "data", "sample.bits")
+
+def run(*args, cwd=None, check=True):
+    return subprocess.run([sys.executable]+list(args), stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE, check=check, cwd=cwd)
+
+@pytest.fixture(scope="module")
+def parsed(tmp_path_factory):
+    path=tmp_path_factory.mktemp("inputs")/"sample.parsed"
+    path.write_bytes(run(PARSER, "-o", "line", SAMPLE).stdout)
+    return str(path)
+
+@pytest.mark.parametrize("mode", ["ida", "idapp", "sbd", "acars", "ira"])
+def test_raw_input_matches_parsed(parsed, mode):
+    expected=run(REASSEMBLER, "-m", mode, "-i", parsed).stdout
+    assert run(REASSEMBLER, "-m", mode, "-i", SAMPLE).stdout == expected
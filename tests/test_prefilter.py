@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import inspect
+import pytest
+
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import bitsparser
+
+SAMPLE=os.path.join(ROOT, "tests", "data", "sample.bits")
+
+CLASSES=[cls for (name, cls) in inspect.getmembers(bitsparser, inspect.isclass)
+         if issubclass(cls, bitsparser.Message) and name.startswith("Iridium")]
+
+def sample(filename=None):
+    with open(SAMPLE) as f:
+        lines=[line.strip() for line in f]
+    if filename is not None:
+        lines=[" ".join([f[0], filename]+f[2:]) if len(f)>2 else line
+               for (line, f) in ((line, line.split(" ")) for line in lines)]
+    # twice, so the timestamps of untimed files jump back once
+    return lines+lines
+
+def run(lines, cls, prefilter):
+    parser=bitsparser.Parser()
+    check=parser.make_prefilter(cls) if prefilter else None
+    out=[]
+    for (lineno, line) in enumerate(lines, 1):
+        if check is not None and not check(line):
+            continue
+        q=bitsparser.Message(line, lineno, parser).upgrade()
+        if isinstance(q, cls):
+            out.append((q.globalns, q.pretty()))
+    return (out, parser.tsoffset, parser.maxts)
+
+@pytest.mark.parametrize("filename", [None, "untimed.bits", "/dev/stdin"])
+@pytest.mark.parametrize("cls", CLASSES, ids=lambda cls: cls.__name__)
+def test_prefilter_parity(cls, filename):
+    lines=sample(filename)
+    assert run(lines, cls, True) == run(lines, cls, False)
+
+def test_prefilter_rejects():
+    parser=bitsparser.Parser()
+    assert parser.make_prefilter(bitsparser.IridiumRAMessage) is not None
+    lines=sample()
+    assert sum(map(parser.make_prefilter(bitsparser.IridiumRAMessage), lines)) < len(lines)//4
+
+def test_untimed_ts_advances():
+    (out, tsoffset, maxts)=run(sample("untimed.bits"), bitsparser.IridiumRAMessage, True)
+    assert out
+    assert tsoffset > 0
+    assert maxts >= tsoffset
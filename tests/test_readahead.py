@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import subprocess
+
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PARSER=os.path.join(ROOT, "iridium-parser.py")
+SAMPLE=os.path.join(ROOT, "tests", "data", "sample.bits")
+
+def parse(*args, cwd=None, check=True):
+    """stdout of iridium-parser.py -o line with args"""
+    return subprocess.run([sys.executable, PARSER, "-o", "line"]+list(args), stdout=subprocess.PIPE,
+                          stderr=subprocess.DEVNULL, check=check, cwd=cwd).stdout
+
+def test_byte_ranges():
+    size=os.path.getsize(SAMPLE)
+    (first, second)=(size//3, 2*size//3)
+    parts=parse("--stop-offset", str(first), SAMPLE)
+    parts+=parse("--start-offset", str(first), "--stop-offset", str(second), SAMPLE)
+    parts+=parse("--start-offset", str(second), SAMPLE)
+    assert parts == parse(SAMPLE)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import subprocess
+import pytest
+
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PARSER=os.path.join(ROOT, "iridium-parser.py")
+REASSEMBLER=os.path.join(ROOT, "reassembler.py")
+SAMPLE=os.path.join(ROOT, "tests", "data", "sample.bits")
+MODES=["ida", "idapp", "sbd", "acars", "ira"]
+
+def run(*args, cwd=None, check=True):
+    return subprocess.run([sys.executable]+list(args), stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE, check=check, cwd=cwd)
+
+@pytest.fixture(scope="module")
+def inputs(tmp_path_factory):
+    """The sample as RAW, parsed text and frames input"""
+    tmp=tmp_path_factory.mktemp("inputs")
+    parsed=tmp/"sample.parsed"
+    parsed.write_bytes(run(PARSER, "-o", "line", SAMPLE).stdout)
+    frames=tmp/"sample.frames"
+    frames.write_bytes(run(PARSER, "-o", "frames", SAMPLE).stdout)
+    return {"raw": SAMPLE, "parsed": str(parsed), "frames": str(frames)}
+
+@pytest.mark.parametrize("kind", ["raw", "parsed", "frames"])
+def test_multi_mode_dispatch(inputs, kind, tmp_path):
+    infile=inputs[kind]
+    run(REASSEMBLER, "-m", ",".join(MODES), "-i", infile, "-o", str(tmp_path/"out"), cwd=tmp_path)
+    for mode in MODES:
+        single=run(REASSEMBLER, "-m", mode, "-i", infile, cwd=tmp_path).stdout
+        assert (tmp_path/("out."+mode)).read_bytes() == single, mode
+    assert (tmp_path/"out.ida").stat().st_size > 0
+
+def test_multi_mode_needs_output_for_streams(inputs, tmp_path):
+    with open(inputs["parsed"]) as f:
+        res=subprocess.run([sys.executable, REASSEMBLER, "-m", "ida,sbd"], stdin=f,
+                           stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=tmp_path)
+    assert res.returncode == 2
+    assert b"-o OUTPUT" in res.stderr
+    assert os.listdir(tmp_path) == []
+
+def test_multi_mode_own_files(inputs, tmp_path):
+    # modes writing files themselves get OUTPUT.mode, too
+    single=tmp_path/"single"
+    single.mkdir()
+    run(REASSEMBLER, "-m", "live-map", "-i", inputs["parsed"], cwd=single)
+    run(REASSEMBLER, "-m", "live-mt-map", "--heatmap", "-i", inputs["parsed"], cwd=single)
+    run(REASSEMBLER, "-m", "lap", "-i", inputs["parsed"], "-o", "lap.pcap", cwd=single)
+    run(REASSEMBLER, "-m", "ida,live-map,live-mt-map,lap", "--heatmap", "-i", inputs["parsed"], "-o", "out", cwd=tmp_path)
+    assert (tmp_path/"out.live-map").read_bytes() == (single/"sats.json").read_bytes()
+    assert (tmp_path/"out.live-mt-map").read_bytes() == (single/"mt-heat.json").read_bytes()
+    assert (tmp_path/"out.lap").read_bytes() == (single/"lap.pcap").read_bytes()
+    assert (tmp_path/"out.ida").read_bytes() == run(REASSEMBLER, "-m", "ida", "-i", inputs["parsed"]).stdout
+    assert b'"sats":' in (tmp_path/"out.live-map").read_bytes()
+    assert sorted(os.listdir(tmp_path)) == ["out.ida", "out.lap", "out.live-map", "out.live-mt-map", "single"]
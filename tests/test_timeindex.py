@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import subprocess
+
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import bitsparser
+import timeindex
+
+PARSER=os.path.join(ROOT, "iridium-parser.py")
+SAMPLE=os.path.join(ROOT, "tests", "data", "sample.bits")
+START=1598047209 # start time in the file name of the sample
+
+def parse(*args, cwd=None, check=True):
+    """stdout of iridium-parser.py -o line with args"""
+    return subprocess.run([sys.executable, PARSER, "-o", "line"]+list(args), stdout=subprocess.PIPE,
+                          stderr=subprocess.DEVNULL, check=check, cwd=cwd).stdout
+
+def test_stdin_in_file_list(tmp_path):
+    with open(SAMPLE) as f:
+        lines=f.readlines()
+    (first, second)=(tmp_path/"first.bits", tmp_path/"second.bits")
+    first.write_text("".join(lines[:100]))
+    second.write_text("".join(lines[100:]))
+    expected=parse(str(first), str(second))
+    for opts in ([], ["--jobs", "2"], ["--stats"]):
+        with open(second) as stdin:
+            out=subprocess.run([sys.executable, PARSER, "-o", "line"]+opts+[str(first), "-"], stdin=stdin,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True).stdout
+        assert out == expected, opts
+
+def test_index_seek(longfile):
+    times=("--start", str(START+20*25), "--end", str(START+20*30))
+    expected=parse("--no-index", *times, str(longfile))
+    assert expected
+    assert not os.path.exists(str(longfile)+".idx")
+    assert parse(*times, str(longfile)) == expected # builds the index
+    index=timeindex.Index(str(longfile), bitsparser.raw_globalns)
+    assert index.load()
+    (first, stop)=index.range((START+20*25)*10**9, (START+20*30)*10**9)
+    assert first > 0 and stop is not None
+    assert parse(*times, str(longfile)) == expected # seeks with it
+
+def test_no_index_by_default(tmp_path):
+    path=tmp_path/"sample.bits"
+    path.write_bytes(open(SAMPLE, "rb").read())
+    parse(str(path))
+    assert not os.path.exists(str(path)+".idx")
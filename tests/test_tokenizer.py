@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import pytest
+
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import bitsparser
+
+SAMPLE=os.path.join(ROOT, "tests", "data", "sample.bits")
+
+BITS="001100000011000011110011000100001001111110011000"
+
+# lines split_raw() has to tokenize like the regex
+PLAIN=[
+    "RAW: i-1598047209-t1 0000025.4230 1620992206 A:OK I:00000000000  61% 0.50589 179 "+BITS,
+    "RWA: i-1598047209-t1 0000161.9164 1620858199 A:no I:00000000001  94% 0.28460 179 "+BITS,
+    "NC1: i-1598047209-t1 0000284.5063 1620858149 N:05.42-65.07 I:00000000002 100% 0.28193 179 "+BITS,
+    "RAW: i-1598047209-t1 0000284.5063 1620858149 N:-5.42-65.07 L:0000abcd   8% 0.28193  22 "+BITS,
+    "RAW: i-1598047209-t1 0000284.5063 1620858149 N:+12.5+03.1 I:00000000002  88% 0.28193 179 "+BITS,
+    "RAW: untimed -0000284.5063 1620858149 N:12-65 I:00000000002  88% inf 179 "+BITS,
+    "RAW: - 0000284.5063 1620858149 A:OK I:00000000002  88% nan 179 "+BITS,
+    "RAW: /dev/stdin 284 1620858149 A:OK I:2  88% 0 179 1",
+]
+
+# lines only the regex (or neither) accepts
+ODD=[
+    "RAW: i-1598047209-t1 0000025.4230 1620992206 A:OK I:00000000000  61% 0.50589 179 0011 0000 [0011]<01>",
+    "RAW: i-1598047209-t1 0000025.4230 1620992206 A:OK I:00000000000  61% 0.50589 179 "+BITS+" extra",
+    "RAW: i-1598047209-t1 0000025.4230 1620992206 A:OK I:00000000000  61% 0.50589 179 ",
+    "RAW: i-1598047209-t1 0000025.4230 1620992206 A:OK I:00000000000  61% 0.50589 179",
+    "RAW: i-1598047209-t1 0000025.4230 1620992206 A:OK I:00000000000  61% 0.50589 179 0012",
+    "RAW: i-1598047209-t1 0000025.4230 1620992206 A:OK X:00000000000  61% 0.50589 179 "+BITS,
+    "RAW: i-1598047209-t1 0000025.4230 1620992206 N:05.42 I:00000000000  61% 0.50589 179 "+BITS,
+    "RAW: i-1598047209-t1 0000025.4230 1620992206 A:OK I:00000000000  61 0.50589 179 "+BITS,
+    "RAW: i-1598047209-t1 00.00.25 1620992206 A:OK I:00000000000  61% 0.50589 179 "+BITS,
+    "RAW: i-1598047209-t1 0000025.4230 16209922e6 A:OK I:00000000000  61% 0.50589 179 "+BITS,
+    "RAW:  i-1598047209-t1 0000025.4230 1620992206 A:OK I:00000000000  61% 0.50589 179 "+BITS,
+    "RAX: i-1598047209-t1 0000025.4230 1620992206 A:OK I:00000000000  61% 0.50589 179 "+BITS,
+    "RAW: garbage line",
+    "",
+]
+
+def assert_same(line):
+    split=bitsparser.split_raw(line)
+    assert split is None or split == bitsparser.match_raw(line), line
+    # parse_raw() on PyPy
+    assert (split or bitsparser.match_raw(line)) == bitsparser.match_raw(line), line
+
+@pytest.mark.parametrize("line", PLAIN)
+def test_plain_lines(line):
+    assert bitsparser.split_raw(line) is not None
+    assert_same(line)
+
+@pytest.mark.parametrize("line", ODD)
+def test_odd_lines(line):
+    assert_same(line)
+
+def test_sample_lines():
+    with open(SAMPLE) as f:
+        lines=[line.strip() for line in f]
+    assert sum(bitsparser.split_raw(line) is not None for line in lines) > len(lines)//2
+    for line in lines:
+        assert_same(line)
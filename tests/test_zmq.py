@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import socket
+import subprocess
+import pytest
+
+zmq = pytest.importorskip("zmq")
+
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import framepack
+
+PARSER=os.path.join(ROOT, "iridium-parser.py")
+SAMPLE=os.path.join(ROOT, "tests", "data", "sample.bits")
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+@pytest.mark.parametrize("join", [False, True])
+def test_batched_frames_topic(join, tmp_path):
+    out=subprocess.run([sys.executable, PARSER, "-o", "frames", SAMPLE],
+                       stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True, cwd=tmp_path).stdout
+    expected=[rec for rec in framepack.split(out, len(framepack.MAGIC)) if rec.startswith(b"IDA:")]
+    assert len(expected)%8 != 0 # the last batch is partial
+
+    addr="tcp://127.0.0.1:%d"%free_port()
+    cmd=[sys.executable, PARSER, "-o", "zmq", "--zmq-frames", "--zmq-batch", "8", "--zmq-bind", addr]
+    if join:
+        cmd.append("--zmq-join")
+    proc=subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.DEVNULL, cwd=tmp_path)
+    context=zmq.Context()
+    sub=context.socket(zmq.SUB)
+    try:
+        sub.setsockopt(zmq.SUBSCRIBE, b"IDA")
+        sub.connect(addr)
+        time.sleep(2) # until the subscription reached the publisher
+
+        with open(SAMPLE, "rb") as f:
+            proc.stdin.write(f.read())
+        proc.stdin.flush()
+
+        # stdin stays open: the last batch has to be sent while input is idle
+        got=[]
+        while len(got) < len(expected) and sub.poll(5000):
+            for part in sub.recv_multipart():
+                got.extend(framepack.split(part))
+        assert got == expected
+    finally:
+        proc.stdin.close()
+        proc.wait(10)
+        sub.close()
+        context.term()
+
+def test_drops_counted(tmp_path):
+    with open(SAMPLE, "rb") as f:
+        data=f.read()*50
+    expected=len(subprocess.run([sys.executable, PARSER, "-o", "line", "--errorfree"], input=data,
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True).stdout.splitlines())
+
+    addr="tcp://127.0.0.1:%d"%free_port()
+    proc=subprocess.Popen([sys.executable, PARSER, "-o", "zmq", "--zmq-hwm", "1", "--zmq-bind", addr],
+                          stdin=subprocess.PIPE, stderr=subprocess.PIPE, cwd=tmp_path)
+    context=zmq.Context()
+    sub=context.socket(zmq.SUB)
+    try:
+        sub.setsockopt(zmq.RCVHWM, 1)
+        sub.setsockopt(zmq.SUBSCRIBE, b"")
+        sub.connect(addr)
+        time.sleep(2) # until the subscription reached the publisher
+
+        # don't read while the publisher sends, so its queue runs full
+        proc.stdin.write(data)
+        proc.stdin.close()
+        time.sleep(2)
+        got=0
+        while sub.poll(3000):
+            sub.recv_multipart()
+            got+=1
+        proc.wait(10)
+        stderr=proc.stderr.read().decode()
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        sub.close()
+        context.term()
+    dropped=[int(line.split()[0]) for line in stderr.splitlines() if line.endswith(" zmq messages dropped")]
+    assert dropped and dropped[0] > 0
+    assert got+dropped[0] == expected
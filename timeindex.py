@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# vim: set ts=4 sw=4 tw=0 et pm=:
+
+"""
+Sparse time index for .bits and .parsed files
+
+The index is stored next to the file as <file>.idx. After a header line
+with the size of the indexed file it has one line per block (of about
+1 MB) of input: the byte offset of the block and the lowest and highest
+globalns of the lines in it. As lines are not strictly sorted by time,
+seeking uses both to find the byte range which can contain a time range.
+
+The index is built on the side when a whole uncompressed file is read
+through open_lines() with a time range (or with use_index=True).
+"""
+
+import os
+import sys
+import datetime
+
+import readahead
+
+def parse_time(arg):
+    """Time argument (unix time or ISO 8601, UTC if no zone is given) as ns"""
+    try:
+        return int(float(arg)*10**9)
+    except ValueError:
+        pass
+    ts=datetime.datetime.fromisoformat(arg.replace("Z", "+00:00"))
+    if ts.tzinfo is None:
+        ts=ts.replace(tzinfo=datetime.timezone.utc)
+    return int(ts.timestamp())*10**9+ts.microsecond*1000
+
+def parsed_globalns(line):
+    """globalns of an iridium-parser output line, None if unknown"""
+    try:
+        _, name, mstime, _ = line.split(None, 3)
+        if not name.startswith("p-"):
+            return None
+        return int(name[2:].partition("-")[0])*10**9+int(float(mstime)*10**6)
+    except ValueError:
+        return None
+
+def in_range(ns, start, end):
+    return (start is None or ns>=start) and (end is None or ns<end)
+
+def time_filter(lines, timefn, start, end):
+    """Lines within [start, end), lines without known time are passed on"""
+    for line in lines:
+        ns=timefn(line)
+        if ns is None or in_range(ns, start, end):
+            yield line
+
+class Index(object):
+    def __init__(self, filename, timefn):
+        self.filename=filename
+        self.path=filename+".idx"
+        self.timefn=timefn
+        self.blocks=[] # (offset, min ns, max ns)
+
+    def load(self):
+        """Read the index, returns False if it is missing or outdated"""
+        try:
+            size=os.stat(self.filename).st_size
+            with open(self.path) as f:
+                if f.readline().split()[-1:]!=[str(size)]:
+                    return False
+                self.blocks=[tuple(map(int, l.split())) for l in f]
+        except (OSError, ValueError):
+            self.blocks=[]
+            return False
+        return True
+
+    def save(self, size):
+        if not self.blocks:
+            return
+        # the index is optional, don't complain about read-only directories
+        if not os.access(os.path.dirname(self.path) or ".", os.W_OK):
+            return
+        tmp="%s.%d.tmp"%(self.path, os.getpid())
+        try:
+            with open(tmp, "w") as f:
+                print("# iridium-toolkit time index, size %d"%size, file=f)
+                for block in self.blocks:
+                    print("%d %d %d"%block, file=f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print("Could not write index:", e, file=sys.stderr)
+
+    def add_block(self, offset, lines):
+        """blockhook for readahead.MappedLines"""
+        if lines is None: # end of file
+            self.save(offset)
+            return
+        times=[ns for ns in map(self.timefn, lines) if ns is not None]
+        if times:
+            self.blocks.append((offset, min(times), max(times)))
+
+    def range(self, start, end):
+        """Byte range (start, stop) containing all lines within [start, end)"""
+        first=0
+        if start is not None:
+            for (offset, _, hi) in self.blocks:
+                if hi>=start:
+                    first=offset
+                    break
+            else:
+                return (0, 0)
+        stop=None
+        if end is not None:
+            for (idx, (_, lo, _)) in reversed(list(enumerate(self.blocks))):
+                if lo<end:
+                    if idx+1<len(self.blocks):
+                        stop=self.blocks[idx+1][0]
+                    break
+            else:
+                return (0, 0)
+        return (first, stop)
+
+def open_lines(filename, timefn, start=None, end=None, use_index=None, byte_start=0, byte_stop=None):
+    """readahead.open_lines(), limited to the part of the file which can
+    contain lines within [start, end) (ns) if the file has an index.
+
+    Reading a whole uncompressed file without index creates one, by default
+    (use_index=None) only if a time range is given.
+    Lines still need to be filtered by time.
+    """
+    if use_index is None:
+        use_index=start is not None or end is not None
+    index=None
+    if use_index and filename != '-' and not filename.startswith("/dev/"):
+        index=Index(filename, timefn)
+        if index.load():
+            if start is not None or end is not None:
+                (first, stop)=index.range(start, end)
+                byte_start=max(byte_start, first)
+                if stop is not None and (byte_stop is None or stop<byte_stop):
+                    byte_stop=stop
+            index=None
+    infile=readahead.open_lines(filename, byte_start, byte_stop)
+    if index is not None and isinstance(infile, readahead.MappedLines) and infile.start==0 and byte_stop is None:
+        infile.blockhook=index.add_block
+    return infile
@@ -90,6 +90,125 @@ def slice_extra(string, n):
 def slice(string, n):
     return [string[x:x+n] for x in range(0, len(string),n)]
 
+class Bits(object):
+    """Immutable bit string backed by an int (first bit is the MSB)
+
+    Supports len(), indexing/slicing like a str of '0'/'1' (an index gives
+    '0' or '1', a slice another Bits) and str() conversion. Use uint()/bin()
+    to extract fields without slicing.
+    """
+    __slots__ = ('val', 'len')
+
+    def __init__(self, val=0, length=0):
+        self.val = val
+        self.len = length
+
+    @classmethod
+    def fromstr(cls, bits):
+        if not bits:
+            return cls()
+        return cls(int(bits, 2), len(bits))
+
+    def __len__(self):
+        return self.len
+
+    def __str__(self):
+        if self.len == 0:
+            return ""
+        return format(self.val, "0%db" % self.len)
+
+    def __repr__(self):
+        return "Bits('%s')" % self
+
+    def __int__(self):
+        return self.val
+
+    def __eq__(self, other):
+        if isinstance(other, Bits):
+            return self.len == other.len and self.val == other.val
+        if isinstance(other, str):
+            return str(self) == other
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.val, self.len))
+
+    def __add__(self, other):
+        if isinstance(other, str):
+            other = Bits.fromstr(other)
+        return Bits((self.val << other.len) | other.val, self.len + other.len)
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            if key < 0:
+                key += self.len
+            if not 0 <= key < self.len:
+                raise IndexError("Bits index out of range")
+            return "01"[(self.val >> (self.len-1-key)) & 1]
+        start, stop, step = key.indices(self.len)
+        if step == 1:
+            if stop <= start:
+                return Bits()
+            return Bits((self.val >> (self.len-stop)) & ((1 << (stop-start))-1), stop-start)
+        return Bits.fromstr(str(self)[key])
+
+    def uint(self, start=0, end=None):
+        """Value of bits [start:end] as unsigned int"""
+        if end is None or end > self.len:
+            end = self.len
+        if end <= start:
+            return 0
+        return (self.val >> (self.len-end)) & ((1 << (end-start))-1)
+
+    def bin(self, start=0, end=None):
+        """Bits [start:end] as string of '0'/'1'"""
+        return str(self[start:end])
+
+    def split(self, n):
+        """Like slice_extra(): list of n bit blocks plus the remaining bits"""
+        cnt, rest = divmod(self.len, n)
+        mask = (1 << n)-1
+        val = self.val >> rest
+        blocks = [Bits((val >> (n*x)) & mask, n) for x in range(cnt-1, -1, -1)]
+        return (blocks, Bits(self.val & ((1 << rest)-1), rest))
+
+    def count(self, bit="1"):
+        ones = bin(self.val).count("1")
+        if bit == "1":
+            return ones
+        return self.len-ones
+
+    def tobytes(self):
+        """Split into 8 bit values, a short last group is kept right-aligned"""
+        rest = self.len % 8
+        data = (self.val >> rest).to_bytes(self.len//8, 'big')
+        if rest:
+            data += bytes([self.val & ((1 << rest)-1)])
+        return data
+
+
+class lazy(object):
+    """Attribute which is only decoded on first access
+
+    func(obj) has to store the value(s) in obj.__dict__, which then shadows
+    this (non-data) descriptor. If it doesn't, the attribute does not exist.
+    """
+    def __init__(self, func):
+        self.func = func
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        self.func(obj)
+        try:
+            return obj.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name)
+
+
 def to_ascii(data, dot=False, escape=False, mask=False):
     str=""
     for c in data:
@@ -114,6 +233,9 @@ def to_ascii(data, dot=False, escape=False, mask=False):
 def bitdiff(a, b):
     return sum(x != y for x, y in zip(a, b))
 
+def intdiff(a, b): # bitdiff() for equal length bitstrings stored as int
+    return bin(a ^ b).count("1")
+
 def objprint(q):
     for i in dir(q):
         attr = getattr(q, i)